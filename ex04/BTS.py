@@ -1,111 +1,488 @@
-import urllib.request
-from typing import Optional, List
+import heapq
+from typing import Iterable, Iterator, Optional, List, Tuple, Union
+
+from index import PrefixIndex, prefix_bound
+from wordlist import iter_sorted_entries
 
 class Node:
     """Node class for the Binary Search Tree"""
-    def __init__(self, word: str):
+    __slots__ = ('word', 'left', 'right', 'weight', 'top', 'height')
+    
+    def __init__(self, word: str, weight: float = 1.0, height: int = 1):
         self.word = word
         self.left: Optional['Node'] = None
         self.right: Optional['Node'] = None
+        self.weight = weight
+        # Heaviest node of this subtree (leftmost on ties), maintained on weighted trees
+        self.top: 'Node' = self
+        # Levels in this subtree, used to keep the tree AVL-balanced under updates
+        self.height = height
+
+def _heavier(a: Node, b: Node) -> bool:
+    """True if a ranks before b: higher weight, or equal weight and alphabetically first"""
+    return a.weight > b.weight or (a.weight == b.weight and a.word < b.word)
 
-class BST:
-    """Binary Search Tree for efficient prefix searching"""
+def _height(node: Optional[Node]) -> int:
+    return node.height if node is not None else 0
+
+class BST(PrefixIndex):
+    """
+    Binary Search Tree for efficient prefix searching
+    
+    The tree is built perfectly balanced from the sorted wordlist and kept
+    AVL-balanced by insert and delete, so it stays O(log n) deep under updates.
+    """
     
     def __init__(self, source: str, **kwargs):
+        self._init_sorted(iter_sorted_entries(source, **kwargs), kwargs.get('weighted', False))
+    
+    def _init_sorted(self, entries: Iterable[Tuple[str, float]], weighted: bool) -> None:
         self.root: Optional[Node] = None
-        self.results: List[str] = []
+        self.weighted = weighted
         
-        url_mode = kwargs.get('url', False)
-        file_mode = kwargs.get('file', False)
+        weights = None
+        if self.weighted:
+            entries = list(entries)
+            weights = [weight for _, weight in entries]
+        words = [word for word, _ in entries]
         
-        if url_mode and file_mode:
-            raise ValueError("Both url and file cannot be True at the same time")
+        self._load(words, weights)
+    
+    def _load(self, words: List[str], weights: Optional[List[float]]) -> None:
+        """Replace the tree with a balanced one over sorted, unique words"""
+        self.root = None
+        self.size = len(words)
+        
+        # Build balanced BST
+        if words:
+            self.root = self._build_balanced_bst(words, 0, len(words) - 1, weights)
+            if self.weighted:
+                self._update_tops()
+    
+    def _build_balanced_bst(self, words: List[str], start: int, end: int,
+                            weights: Optional[List[float]] = None) -> Optional[Node]:
+        """Build a balanced BST from sorted word list, using an explicit stack instead of recursion"""
+        root: Optional[Node] = None
+        # Pending ranges as (start, end, parent, attach as left child)
+        stack = [(start, end, None, False)]
         
-        words = []
+        while stack:
+            start, end, parent, is_left = stack.pop()
+            if start > end:
+                continue
+            
+            mid = (start + end) // 2
+            # A perfectly balanced subtree over m words is m.bit_length() levels tall
+            height = (end - start + 1).bit_length()
+            node = Node(words[mid], 1.0 if weights is None else weights[mid], height)
+            
+            if parent is None:
+                root = node
+            elif is_left:
+                parent.left = node
+            else:
+                parent.right = node
+            
+            stack.append((mid + 1, end, node, False))
+            stack.append((start, mid - 1, node, True))
         
-        if url_mode:
-            # Fetch wordlist from URL
-            try:
-                with urllib.request.urlopen(source) as response:
-                    content = response.read().decode('utf-8')
-                    words = [line.strip().lower() for line in content.split('\n') if line.strip()]
-            except Exception as e:
-                raise Exception(f"Failed to fetch wordlist from URL: {e}")
+        return root
+    
+    def _update_tops(self) -> None:
+        """Recompute every subtree's heaviest node, children before parents"""
+        order: List[Node] = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            if node.left:
+                stack.append(node.left)
+            if node.right:
+                stack.append(node.right)
         
-        elif file_mode:
-            # Read wordlist from local file
-            try:
-                with open(source, 'r', encoding='utf-8') as f:
-                    words = [line.strip().lower() for line in f if line.strip()]
-            except Exception as e:
-                raise Exception(f"Failed to read wordlist from file: {e}")
+        # Pre-order reversed visits every child before its parent
+        for node in reversed(order):
+            top = node
+            if node.left and _heavier(node.left.top, top):
+                top = node.left.top
+            if node.right and _heavier(node.right.top, top):
+                top = node.right.top
+            node.top = top
+    
+    def _refresh(self, node: Node) -> None:
+        """Recompute a node's height and subtree top from its children"""
+        node.height = 1 + max(_height(node.left), _height(node.right))
+        if self.weighted:
+            top = node
+            if node.left and _heavier(node.left.top, top):
+                top = node.left.top
+            if node.right and _heavier(node.right.top, top):
+                top = node.right.top
+            node.top = top
+    
+    def _rotate_left(self, node: Node) -> Node:
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._refresh(node)
+        self._refresh(pivot)
+        return pivot
+    
+    def _rotate_right(self, node: Node) -> Node:
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._refresh(node)
+        self._refresh(pivot)
+        return pivot
+    
+    def _balance(self, node: Node) -> Node:
+        """Restore the AVL property at node and return the root of its subtree"""
+        self._refresh(node)
+        balance = _height(node.left) - _height(node.right)
         
-        else:
-            # Assume it's a string of words separated by spaces or newlines
-            if '\n' in source:
-                words = [word.strip().lower() for word in source.split('\n') if word.strip()]
+        if balance > 1:
+            if _height(node.left.left) < _height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if _height(node.right.right) < _height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
+    
+    def _rebalance(self, path: List[Node]) -> None:
+        """Rebalance every node on a root-to-leaf path, bottom-up"""
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            subtree = self._balance(node)
+            if i == 0:
+                self.root = subtree
+            elif path[i - 1].left is node:
+                path[i - 1].left = subtree
             else:
-                words = [word.strip().lower() for word in source.split() if word.strip()]
+                path[i - 1].right = subtree
+    
+    def insert(self, word: str, weight: float = 1.0) -> bool:
+        """
+        Add a word to the index in O(log n)
         
-        # Remove duplicates and sort
-        words = sorted(list(set(words)))
+        Args:
+            word: Word to add (normalized like the wordlist)
+            weight: Its weight; on a weighted tree an existing word's weight is increased by it
+            
+        Returns:
+            True if the word was new
+        """
+        word = word.strip().lower()
+        if not word:
+            return False
         
-        # Build balanced BST
-        if words:
-            self.root = self._build_balanced_bst(words, 0, len(words) - 1)
+        path: List[Node] = []
+        node = self.root
+        while node is not None:
+            path.append(node)
+            if word == node.word:
+                if self.weighted and weight:
+                    node.weight += weight
+                    self._rebalance(path)
+                    self.version += 1
+                return False
+            node = node.left if word < node.word else node.right
+        
+        leaf = Node(word, weight if self.weighted else 1.0)
+        if not path:
+            self.root = leaf
+        elif word < path[-1].word:
+            path[-1].left = leaf
+        else:
+            path[-1].right = leaf
+        
+        self._rebalance(path)
+        self.size += 1
+        self.version += 1
+        return True
     
-    def _build_balanced_bst(self, words: List[str], start: int, end: int) -> Optional[Node]:
-        """Recursively build a balanced BST from sorted word list"""
-        if start > end:
-            return None
+    def delete(self, word: str) -> bool:
+        """
+        Remove a word from the index in O(log n)
+        
+        Args:
+            word: Word to remove
+            
+        Returns:
+            True if the word was present
+        """
+        word = word.strip().lower()
+        path: List[Node] = []
+        node = self.root
+        while node is not None and node.word != word:
+            path.append(node)
+            node = node.left if word < node.word else node.right
+        if node is None:
+            return False
         
-        mid = (start + end) // 2
-        node = Node(words[mid])
+        if node.left is not None and node.right is not None:
+            # Take over the in-order successor's word, then unlink the successor instead
+            path.append(node)
+            successor = node.right
+            while successor.left is not None:
+                path.append(successor)
+                successor = successor.left
+            node.word, node.weight = successor.word, successor.weight
+            node = successor
         
-        node.left = self._build_balanced_bst(words, start, mid - 1)
-        node.right = self._build_balanced_bst(words, mid + 1, end)
+        child = node.left if node.left is not None else node.right
+        if not path:
+            self.root = child
+        elif path[-1].left is node:
+            path[-1].left = child
+        else:
+            path[-1].right = child
         
-        return node
+        self._rebalance(path)
+        self.size -= 1
+        self.version += 1
+        return True
     
-    def autocomplete(self, prefix: str) -> List[str]:
+    def _iter_nodes(self) -> Iterator[Node]:
+        """Yield every node in order"""
+        stack: List[Node] = []
+        node = self.root
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                yield node
+                node = node.right
+    
+    def __reduce__(self):
+        # Pickled as its sorted entries (for worker processes); rebuilding is linear
+        # and much cheaper than pickling every node and its links
+        entries = [(node.word, node.weight) for node in self._iter_nodes()]
+        return type(self).from_sorted, (entries, self.weighted)
+    
+    def merge(self, entries: Iterable[Union[str, Tuple[str, float]]]) -> int:
+        """
+        Add a batch of words in one pass instead of inserting them one by one
+        
+        The new words are sorted and merged with the tree's in-order sequence,
+        then the tree is rebuilt perfectly balanced, in O(n + m log m).
+        
+        Args:
+            entries: Words, or (word, weight) pairs; the weights of words that
+                are already present (or repeated) are added together
+                
+        Returns:
+            Number of words that were new
+        """
+        batch = {}
+        for entry in entries:
+            word, weight = (entry, 1.0) if isinstance(entry, str) else entry
+            word = word.strip().lower()
+            if word:
+                batch[word] = batch.get(word, 0.0) + weight
+        if not batch:
+            return 0
+        
+        incoming = sorted(batch.items())
+        words: List[str] = []
+        weights: List[float] = []
+        added = 0
+        i = 0
+        for node in self._iter_nodes():
+            while i < len(incoming) and incoming[i][0] < node.word:
+                words.append(incoming[i][0])
+                weights.append(incoming[i][1])
+                added += 1
+                i += 1
+            weight = node.weight
+            if i < len(incoming) and incoming[i][0] == node.word:
+                weight += incoming[i][1]
+                i += 1
+            words.append(node.word)
+            weights.append(weight)
+        for word, weight in incoming[i:]:
+            words.append(word)
+            weights.append(weight)
+            added += 1
+        
+        if not self.weighted:
+            weights = None
+        self._load(words, weights)
+        self.version += 1
+        return added
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def locate(self, prefix: str, start: Optional[Node] = None) -> Optional[Node]:
         """
-        Public method to get autocomplete suggestions for a prefix
+        Find the highest node whose word lies in [prefix, prefix_bound(prefix))
+        
+        Every other word in that range is inside this node's subtree, and the
+        node for a longer prefix is always inside the subtree of a shorter one.
         
         Args:
-            prefix: The prefix to search for
+            prefix: Lowercase prefix to search for
+            start: Node located for a prefix of `prefix` (None starts at the root)
             
         Returns:
-            List of words that start with the prefix
+            The subtree root holding all matches, or None if no word matches
         """
-        self.results = []
-        prefix = prefix.lower()
+        high = prefix_bound(prefix)
+        node = self.root if start is None else start
         
-        if self.root:
-            self._collect(self.root, prefix)
+        while node is not None:
+            if node.word < prefix:
+                node = node.right
+            elif high is not None and node.word >= high:
+                node = node.left
+            else:
+                return node
         
-        return sorted(self.results)  # Return sorted results
+        return None
+    
+    def _ceiling(self, node: Optional[Node], bound: str) -> Optional[Node]:
+        """Node with the smallest word >= bound in the subtree of node, if any"""
+        best = None
+        while node is not None:
+            if node.word >= bound:
+                best = node
+                node = node.left
+            else:
+                node = node.right
+        return best
     
-    def _collect(self, node: Optional[Node], prefix: str) -> None:
+    def iter_children(self, cursor: Node, prefix: str) -> Iterator[Tuple[str, Node]]:
         """
-        Private method to collect words starting with prefix using in-order traversal
+        Yield the next characters after prefix, each with its located subtree
+        
+        Each character costs one ceiling search and one locate inside the
+        prefix's subtree, both O(log n).
         
         Args:
-            node: Current node in BST
-            prefix: Prefix to search for
+            cursor: Node returned by locate(prefix)
+            prefix: The prefix the node was located for
         """
-        if node is None:
+        depth = len(prefix)
+        # Longer words starting with the prefix are >= prefix + '\0', the prefix itself is not
+        node = self._ceiling(cursor, prefix + '\0')
+        while node is not None and node.word.startswith(prefix):
+            ch = node.word[depth]
+            yield ch, self.locate(prefix + ch, cursor)
+            bound = prefix_bound(prefix + ch)
+            node = self._ceiling(cursor, bound) if bound is not None else None
+    
+    def iter_range(self, cursor: Node, prefix: str) -> Iterator[str]:
+        """
+        Lazily yield the words below cursor that start with prefix, in order
+        
+        Args:
+            cursor: Node returned by locate(prefix)
+            prefix: The prefix the node was located for
+        """
+        high = prefix_bound(prefix)
+        return self._collect(cursor, prefix, high)
+    
+    def _collect(self, node: Optional[Node], low: str, high: Optional[str]) -> Iterator[str]:
+        """
+        Private method to yield words in [low, high) using an iterative in-order traversal
+        
+        All traversal state is local to the generator, so concurrent queries on
+        a shared tree do not interfere with each other.
+        
+        Args:
+            node: Root of the subtree to search
+            low: Inclusive lower bound (the prefix itself)
+            high: Exclusive upper bound, or None for no upper bound
+        """
+        stack: List[Node] = []
+        
+        while stack or node is not None:
+            if node is not None:
+                if node.word >= low:
+                    # Smaller words may still be in range, visit them first
+                    stack.append(node)
+                    node = node.left
+                else:
+                    # This word and its whole left subtree are below the range
+                    node = node.right
+                continue
+            
+            node = stack.pop()
+            if high is not None and node.word >= high:
+                # In-order, so every remaining word is above the range too
+                return
+            yield node.word
+            node = node.right
+    
+    def iter_ranked_entries(self, cursor: Node, prefix: str) -> Iterator[Tuple[str, float]]:
+        """
+        Lazily yield (word, weight) for the words below cursor that start with prefix, heaviest first
+        
+        The range is first split into O(log n) pieces: single nodes, and whole
+        subtrees that lie entirely inside it. A heap orders the pieces by their
+        heaviest word (the stored subtree top). Taking a subtree's top splits
+        the rest of that subtree along the path to it, so whole branches whose
+        maximum is too small are never visited. Ties come out alphabetically.
+        
+        Args:
+            cursor: Node returned by locate(prefix)
+            prefix: The prefix the node was located for
+        """
+        if not self.weighted:
+            yield from super().iter_ranked_entries(cursor, prefix)
             return
         
-        # If current word starts with prefix, add it to results
-        if node.word.startswith(prefix):
-            self.results.append(node.word)
+        high = prefix_bound(prefix)
+        # Entries are (-weight, word, node, whole subtree?); words are unique, so nodes are never compared
+        heap = []
         
-        # If prefix is less than or equal to current word, search left subtree
-        # We search left even when prefix matches because there might be words
-        # in left subtree that also match (due to BST properties)
-        if prefix <= node.word or node.word.startswith(prefix):
-            self._collect(node.left, prefix)
+        def push_node(node: Node) -> None:
+            heapq.heappush(heap, (-node.weight, node.word, node, False))
         
-        # If prefix is greater than or equal to current word, search right subtree
-        if prefix >= node.word[:len(prefix)] or node.word.startswith(prefix):
-            self._collect(node.right, prefix)
\ No newline at end of file
+        def push_subtree(node: Optional[Node]) -> None:
+            if node is not None:
+                heapq.heappush(heap, (-node.top.weight, node.top.word, node, True))
+        
+        push_node(cursor)
+        # Left boundary: every node at or above the prefix is in range, and so is its right subtree
+        node = cursor.left
+        while node is not None:
+            if node.word >= prefix:
+                push_node(node)
+                push_subtree(node.right)
+                node = node.left
+            else:
+                node = node.right
+        # Right boundary: every node below the upper bound is in range, and so is its left subtree
+        node = cursor.right
+        while node is not None:
+            if high is None or node.word < high:
+                push_node(node)
+                push_subtree(node.left)
+                node = node.right
+            else:
+                node = node.left
+        
+        while heap:
+            weight, word, node, whole = heapq.heappop(heap)
+            yield word, -weight
+            if not whole:
+                continue
+            
+            # The rest of the subtree is everything hanging off the path down to its top
+            top = node.top
+            while node is not top:
+                push_node(node)
+                if word < node.word:
+                    push_subtree(node.right)
+                    node = node.left
+                else:
+                    push_subtree(node.left)
+                    node = node.right
+            push_subtree(top.left)
+            push_subtree(top.right)
@@ -0,0 +1,37 @@
+"""
+Atomic file replacement
+
+Files that other runs read back (snapshots, downloaded wordlists, cache
+metadata, benchmark wordlists, maze distance fields) are written to a
+temporary file next to their destination and renamed over it, so a crash
+or a full disk leaves either the old file or the complete new one.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'wb', encoding: Optional[str] = None) -> Iterator[IO]:
+    """
+    Open a temporary file that replaces path once the block finishes
+
+    If the block raises, the temporary file is removed and path is left as it was.
+
+    Args:
+        path: Destination file; its directory must exist
+        mode: 'wb' for bytes or 'w' for text
+        encoding: Text encoding, for mode 'w'
+
+    Yields:
+        The open temporary file
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Benchmark the autocomplete index backends
+
+For every wordlist size and backend this builds the index in a fresh
+process, so each measurement starts from a clean heap, and reports the build
+time, the peak resident set size of that process and the latency
+percentiles of autocomplete over replayed keystroke sequences: words typed
+out one character at a time, with the occasional typo and backspace. Every
+measurement is printed as one JSON object per line, so runs can be appended
+to a file and compared over time.
+
+Synthetic wordlists are generated from a seed and cached on disk, so the
+benchmark runs offline and repeated runs use identical input.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from atomic import atomic_write
+from search_engine import BACKENDS
+from server import latency_summary
+from sharded import build_sharded
+from snapshot import SNAPSHOT_DIR, load_or_build
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+BENCH_DIR = os.path.join(SNAPSHOT_DIR, 'bench')
+
+# English letter frequencies (percent), so prefixes branch roughly like real words do
+LETTER_FREQUENCIES = {
+    'a': 8.2, 'b': 1.5, 'c': 2.8, 'd': 4.3, 'e': 12.7, 'f': 2.2, 'g': 2.0, 'h': 6.1,
+    'i': 7.0, 'j': 0.2, 'k': 0.8, 'l': 4.0, 'm': 2.4, 'n': 6.7, 'o': 7.5, 'p': 1.9,
+    'q': 0.1, 'r': 6.0, 's': 6.3, 't': 9.1, 'u': 2.8, 'v': 1.0, 'w': 2.4, 'x': 0.2,
+    'y': 2.0, 'z': 0.1,
+}
+
+def generate_wordlist(count: int, seed: int = 0, weighted: bool = False, directory: str = BENCH_DIR) -> str:
+    """
+    Write a synthetic wordlist, or reuse the one a previous run generated
+
+    Args:
+        count: Number of lines (a few words may repeat, the backends deduplicate them)
+        seed: Random seed
+        weighted: Append a Zipf-distributed frequency column to every line
+        directory: Where generated wordlists are kept
+
+    Returns:
+        Path of the wordlist file
+    """
+    suffix = '-weighted' if weighted else ''
+    path = os.path.join(directory, f'words-{count}-{seed}{suffix}.txt')
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    letters = list(LETTER_FREQUENCIES)
+    cumulative = []
+    total = 0.0
+    for frequency in LETTER_FREQUENCIES.values():
+        total += frequency
+        cumulative.append(total)
+
+    # Written next to the final file and renamed, so an interrupted run leaves no partial list
+    with atomic_write(path, 'w', encoding='utf-8') as f:
+        for rank in range(1, count + 1):
+            length = min(20, max(2, int(rng.gauss(8, 2.5))))
+            word = ''.join(rng.choices(letters, cum_weights=cumulative, k=length))
+            if weighted:
+                f.write(f"{word} {max(1, round(1_000_000 / rank))}\n")
+            else:
+                f.write(word + '\n')
+    return path
+
+def make_keystrokes(words: List[str], sessions: int, seed: int = 0, typo_rate: float = 0.1) -> List[str]:
+    """
+    Replay users typing words from the list, one prefix per keystroke
+
+    Args:
+        words: Words to type
+        sessions: Number of words typed
+        seed: Random seed
+        typo_rate: Chance that a word gets a wrong character, corrected with backspace
+
+    Returns:
+        The prefix seen after every keystroke, in order
+    """
+    rng = random.Random(seed)
+    prefixes: List[str] = []
+    for _ in range(sessions):
+        word = rng.choice(words)
+        typo_at = rng.randrange(len(word)) if rng.random() < typo_rate else -1
+        for i in range(1, len(word) + 1):
+            if i - 1 == typo_at:
+                prefixes.append(word[:i - 1] + rng.choice('abcdefghijklmnopqrstuvwxyz'))
+            prefixes.append(word[:i])
+    return prefixes
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in megabytes (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+def measure(backend: str, wordlist: str, sessions: int, limit: int, seed: int, weighted: bool,
+            processes: int = 0) -> Dict[str, Any]:
+    """
+    Build one backend over a wordlist and time replayed keystrokes against it
+
+    Meant to run in a process of its own (see run_backend), since the peak
+    memory it reports covers the whole process.
+    """
+    rss_before = peak_rss_mb()
+    snapshot_dir = None
+    start = time.perf_counter()
+    if backend == 'mapped':
+        # Always measure a cold build rather than reopening a cached snapshot
+        snapshot_dir = tempfile.mkdtemp(prefix='bench-')
+        index = load_or_build(wordlist, os.path.join(snapshot_dir, 'words.idx'), file=True, weighted=weighted)
+    elif processes > 1:
+        index = build_sharded(wordlist, BACKENDS[backend], processes, stitch=True, file=True, weighted=weighted)
+    else:
+        index = BACKENDS[backend](wordlist, file=True, weighted=weighted)
+    build_seconds = time.perf_counter() - start
+    rss_after = peak_rss_mb()
+
+    try:
+        words = index.autocomplete('')
+        prefixes = make_keystrokes(words, sessions, seed)
+
+        latencies = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            index.autocomplete(prefix, limit=limit)
+            latencies.append(time.perf_counter() - started)
+
+        # The interactive loop narrows a session instead of searching from scratch
+        session = index.session(limit=limit)
+        session_latencies = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            session.set_prefix(prefix)
+            session.suggestions()
+            session_latencies.append(time.perf_counter() - started)
+    finally:
+        if snapshot_dir is not None:
+            index.close()
+            for name in os.listdir(snapshot_dir):
+                os.unlink(os.path.join(snapshot_dir, name))
+            os.rmdir(snapshot_dir)
+
+    return {
+        'backend': backend,
+        'words': len(words),
+        'weighted': weighted and index.weighted,
+        'processes': processes if backend != 'mapped' else 0,
+        'build_seconds': build_seconds,
+        'peak_rss_mb': rss_after,
+        'build_rss_mb': None if rss_after is None else rss_after - rss_before,
+        'queries': len(prefixes),
+        'limit': limit,
+        'latency_ms': latency_summary(latencies),
+        'session_latency_ms': latency_summary(session_latencies),
+    }
+
+def run_backend(backend: str, wordlist: str, sessions: int, limit: int, seed: int, weighted: bool,
+                processes: int = 0) -> Dict[str, Any]:
+    """Run measure() for one backend in a fresh interpreter and return its result"""
+    command = [sys.executable, os.path.abspath(__file__), '--worker', backend, '--wordlist', wordlist,
+               '--sessions', str(sessions), '--limit', str(limit), '--seed', str(seed),
+               '--processes', str(processes)]
+    if weighted:
+        command.append('--weighted')
+    completed = subprocess.run(command, capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    if completed.returncode != 0:
+        return {'backend': backend, 'error': completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout)
+
+def git_revision() -> Optional[str]:
+    """Commit the benchmarked code is at, if it lives in a git checkout"""
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the autocomplete index backends")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="synthetic wordlist sizes to benchmark (e.g. 10000 ... 5000000)")
+    parser.add_argument("--wordlist", help="benchmark this wordlist file instead of synthetic ones")
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS))
+    parser.add_argument("--sessions", type=int, default=1000, help="words typed out per measurement")
+    parser.add_argument("--limit", type=int, default=10, help="suggestions requested per keystroke")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--weighted", action="store_true", help="wordlists carry a frequency column")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="build indexes in parallel with this many processes (not for 'mapped')")
+    parser.add_argument("--output", help="append results to this file instead of printing them")
+    parser.add_argument("--worker", choices=sorted(BACKENDS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = measure(args.worker, args.wordlist, args.sessions, args.limit, args.seed, args.weighted,
+                         args.processes)
+        print(json.dumps(result))
+        return
+
+    if args.wordlist:
+        wordlists = [args.wordlist]
+    else:
+        wordlists = [generate_wordlist(size, args.seed, args.weighted) for size in args.sizes]
+
+    common = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+    output = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for wordlist in wordlists:
+            for backend in args.backends:
+                result = run_backend(backend, wordlist, args.sessions, args.limit, args.seed, args.weighted,
+                                     args.processes)
+                result = {**common, 'wordlist': os.path.basename(wordlist), **result}
+                output.write(json.dumps(result) + '\n')
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import sys
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from session import QuerySession
+
+class CachedIndex:
+    """
+    Bounded LRU cache in front of an index's autocomplete
+
+    Short, popular prefixes return the largest result lists, so they are the
+    ones worth remembering. The cache is bounded both by entry count and by an
+    estimate of the memory its result lists hold, evicts least recently used
+    entries first, and is emptied automatically when the index's version
+    changes. Sessions started from the cache look their suggestions up in it
+    too. Every other attribute (locate, fuzzy_autocomplete, ...) is passed
+    through to the wrapped index uncached.
+    """
+
+    def __init__(self, index, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Args:
+            index: A PrefixIndex backend
+            max_entries: Maximum number of cached (prefix, limit, ranked) queries
+            max_bytes: Maximum estimated size of all cached results, in bytes
+        """
+        self.index = index
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: 'OrderedDict[Tuple[str, Optional[int], bool], Tuple[Tuple[str, ...], int]]' = OrderedDict()
+        self._bytes = 0
+        self._version = index.version
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getattr__(self, name: str):
+        return getattr(self.index, name)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def autocomplete(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Cached equivalent of the wrapped index's autocomplete
+
+        Args:
+            prefix: The prefix to search for
+            limit: Stop after this many matches (None returns all of them)
+
+        Returns:
+            List of words that start with the prefix, in alphabetical order
+        """
+        prefix = prefix.lower()
+        return self._lookup((prefix, limit, False), lambda: self.index.autocomplete(prefix, limit))
+
+    def session(self, limit: Optional[int] = None) -> 'CachedSession':
+        """
+        Start an incremental query session whose suggestions go through the cache
+
+        Args:
+            limit: Number of suggestions the session returns per prefix
+
+        Returns:
+            A new CachedSession positioned at the empty prefix
+        """
+        return CachedSession(self, limit)
+
+    def _lookup(self, key: Tuple[str, Optional[int], bool], compute: Callable[[], List[str]]) -> List[str]:
+        """
+        Return the cached results for key, or compute and remember them
+
+        Args:
+            key: (lowercase prefix, limit, whether the results are in ranked order)
+            compute: Produces the results on a miss
+        """
+        if self.index.version != self._version:
+            self.invalidate()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return list(entry[0])
+
+        self.misses += 1
+        results = compute()
+        size = _estimate_size(key[0], results)
+        if size <= self.max_bytes and self.max_entries > 0:
+            self._entries[key] = (tuple(results), size)
+            self._bytes += size
+            self._evict()
+        return results
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until both budgets are met"""
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Forget every cached result, e.g. after the dictionary changed"""
+        self._entries.clear()
+        self._bytes = 0
+        self._version = self.index.version
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns:
+            Hit, miss and eviction counters together with the current cache occupancy
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+        }
+
+class CachedSession(QuerySession):
+    """QuerySession that takes its suggestions from a CachedIndex when it holds them"""
+
+    def __init__(self, cache: CachedIndex, limit: Optional[int] = None):
+        """
+        Args:
+            cache: The CachedIndex; the session narrows cursors on the index it wraps
+            limit: Number of suggestions returned per prefix (None for all)
+        """
+        super().__init__(cache.index, limit)
+        self.cache = cache
+
+    def suggestions(self) -> List[str]:
+        # Unranked suggestions are alphabetical, the same lists autocomplete caches
+        ranked = self.index.weighted
+        return self.cache._lookup((self.prefix, self.limit, ranked), super().suggestions)
+
+def _estimate_size(prefix: str, results: List[str]) -> int:
+    """Approximate memory held by one cache entry"""
+    return (sys.getsizeof(prefix)
+            + sys.getsizeof(tuple(results))
+            + sum(sys.getsizeof(word) for word in results))
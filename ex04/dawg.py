@@ -0,0 +1,149 @@
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from index import PrefixIndex
+from wordlist import iter_sorted_entries
+
+# Edge count and final flag, leading the register key of a state
+_COUNT = struct.Struct('<I?')
+
+class DAWG(PrefixIndex):
+    """
+    Directed acyclic word graph for prefix searching
+
+    The graph is built from the sorted word list with incremental minimization,
+    so words share both their common prefixes and their common suffixes. It is
+    stored in flat arrays: the outgoing edges of state i are the positions
+    edge_start[i] to edge_start[i + 1] of labels and edge_target, sorted by
+    label, and final[i] tells whether the path leading to state i spells a
+    complete word. Words start at state root.
+    """
+
+    def __init__(self, source: str, **kwargs):
+        self._init_sorted(iter_sorted_entries(source, **kwargs), False)
+
+    def _init_sorted(self, entries: Iterable[Tuple[str, float]], weighted: bool) -> None:
+        # Weights are not stored, so suggestions are always alphabetical
+        self.edge_start = array('I')
+        self.edge_target = array('I')
+        self.labels = ''
+        self.final = bytearray()
+        self.size = 0
+
+        # Words are consumed as they stream in; besides the graph, the build holds one register entry per state
+        self.root = self._build(word for word, _ in entries)
+
+    def _build(self, words: Iterable[str]) -> int:
+        """
+        Build a minimal graph from a sorted, deduplicated word list
+
+        A state is numbered once every word through it has been seen, children
+        before parents, and its edges go straight into the flat arrays, since
+        they never change after that. The only states still open are the ones
+        on the previous word's path, as [final, labels, child numbers] with the
+        last child still open. The register maps the packed edges of every
+        numbered state to its number, so an equivalent state is merged instead.
+
+        Returns:
+            Number of the root state
+        """
+        labels: List[str] = []
+        register: Dict[bytes, int] = {}
+        path: List[list] = [[False, [], []]]
+        previous = ""
+
+        def close(state: list) -> int:
+            """Number a state whose children are all numbered, or find its equivalent"""
+            final, state_labels, targets = state
+            key = (_COUNT.pack(len(targets), final) + array('I', targets).tobytes()
+                   + ''.join(state_labels).encode('utf-8', 'surrogatepass'))
+            number = register.get(key)
+            if number is None:
+                number = register[key] = len(self.final)
+                self.final.append(final)
+                self.edge_start.append(len(labels))
+                labels.extend(state_labels)
+                self.edge_target.extend(targets)
+            return number
+
+        def minimize(down_to: int) -> None:
+            """Close the open states deeper than down_to, filling in their parents' edges"""
+            while len(path) > down_to + 1:
+                number = close(path.pop())
+                path[-1][2].append(number)
+
+        for word in words:
+            common = 0
+            shortest = min(len(word), len(previous))
+            while common < shortest and word[common] == previous[common]:
+                common += 1
+
+            minimize(common)
+            for ch in word[common:]:
+                path[-1][1].append(ch)
+                path.append([False, [], []])
+            path[-1][0] = True
+            previous = word
+            self.size += 1
+
+        minimize(0)
+        root = close(path.pop())
+        self.edge_start.append(len(labels))
+        self.labels = ''.join(labels)
+        return root
+
+    def __len__(self) -> int:
+        return self.size
+
+    def locate(self, prefix: str, start: Optional[Tuple[int, int]] = None) -> Optional[Tuple[int, int]]:
+        """
+        Follow prefix from the root, or from the cursor of a shorter prefix
+
+        Args:
+            prefix: Lowercase prefix to search for
+            start: Cursor returned for a prefix of `prefix` (None starts at the root)
+
+        Returns:
+            Cursor (state, len(prefix)) for the state the prefix ends in, or None
+        """
+        state, depth = (self.root, 0) if start is None else start
+        for ch in prefix[depth:]:
+            lo, hi = self.edge_start[state], self.edge_start[state + 1]
+            i = bisect_left(self.labels, ch, lo, hi)
+            if i == hi or self.labels[i] != ch:
+                return None
+            state = self.edge_target[i]
+        return state, len(prefix)
+
+    def iter_children(self, cursor: Tuple[int, int], prefix: str) -> Iterator[Tuple[str, Tuple[int, int]]]:
+        """
+        Yield the outgoing edges of a located state as (label, child cursor)
+
+        Args:
+            cursor: Cursor returned by locate(prefix)
+            prefix: The prefix the cursor was located for
+        """
+        state, depth = cursor
+        for e in range(self.edge_start[state], self.edge_start[state + 1]):
+            yield self.labels[e], (self.edge_target[e], depth + 1)
+
+    def iter_range(self, cursor: Tuple[int, int], prefix: str) -> Iterator[str]:
+        """
+        Lazily yield the words reachable from a located state, in alphabetical order
+
+        Time is proportional to the words produced, not to the size of the graph.
+
+        Args:
+            cursor: Cursor returned by locate(prefix)
+            prefix: The prefix the cursor was located for
+        """
+        # Depth-first, pushing edges in reverse so the smallest label pops first
+        stack = [(cursor[0], prefix)]
+        while stack:
+            state, word = stack.pop()
+            if self.final[state]:
+                yield word
+            for e in range(self.edge_start[state + 1] - 1, self.edge_start[state] - 1, -1):
+                stack.append((self.edge_target[e], word + self.labels[e]))
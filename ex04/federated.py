@@ -0,0 +1,172 @@
+"""
+Several dictionaries queried as one
+
+A FederatedIndex holds a tagged index per source (say an English list, a
+Romanian list and a custom domain list). Every query runs against each
+enabled source and their match streams, which each source already produces
+in order, are merged lazily with a k-way heap merge, so taking k suggestions
+only pulls about k words from the sources and the union of the matches is
+never materialized or sorted.
+"""
+
+import heapq
+from itertools import groupby, repeat
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from index import PrefixIndex, ranking_key
+
+def _first_char(child: Tuple[Tuple[str, Any], int]) -> str:
+    return child[0][0]
+
+class FederatedIndex(PrefixIndex):
+    """
+    Composite index over several tagged backends, each of which can be switched off
+
+    A cursor is a tuple of (source position, source cursor) pairs, one for
+    each enabled source that has matches for the prefix. Words found in more
+    than one source are suggested once, and ranked by the weight of
+    the source that ranks them highest.
+    """
+
+    def __init__(self, sources: Optional[Dict[str, PrefixIndex]] = None):
+        """
+        Args:
+            sources: Indexes by tag, queried in this order when words tie
+        """
+        self._tags: List[str] = []
+        self._indexes: List[PrefixIndex] = []
+        self._enabled: List[bool] = []
+        # Only ever goes up: bumped on every source change and whenever a member's version moves,
+        # so caches and sessions keyed on it never mistake a changed federation for the old one
+        self._version = 0
+        self._member_versions: Tuple[int, ...] = ()
+        for tag, index in (sources or {}).items():
+            self.add_source(tag, index)
+
+    @property
+    def version(self) -> int:
+        members = tuple(index.version for index in self._indexes)
+        if members != self._member_versions:
+            self._changed()
+        return self._version
+
+    def _changed(self) -> None:
+        self._version += 1
+        self._member_versions = tuple(index.version for index in self._indexes)
+
+    @property
+    def weighted(self) -> bool:
+        return any(index.weighted for index in self._active())
+
+    @property
+    def sources(self) -> Dict[str, bool]:
+        """Every source tag, mapped to whether it is enabled"""
+        return dict(zip(self._tags, self._enabled))
+
+    def add_source(self, tag: str, index: PrefixIndex, enabled: bool = True) -> None:
+        """
+        Add a dictionary, or replace the one with the same tag
+
+        Args:
+            tag: Name the source is reported and toggled by
+            index: Any PrefixIndex backend
+            enabled: Whether queries use it right away
+        """
+        if tag in self._tags:
+            position = self._tags.index(tag)
+            self._indexes[position] = index
+            self._enabled[position] = enabled
+        else:
+            self._tags.append(tag)
+            self._indexes.append(index)
+            self._enabled.append(enabled)
+        self._changed()
+
+    def remove_source(self, tag: str) -> PrefixIndex:
+        """Remove a dictionary and return its index"""
+        position = self._position(tag)
+        del self._tags[position]
+        del self._enabled[position]
+        index = self._indexes.pop(position)
+        self._changed()
+        return index
+
+    def enable(self, tag: str, enabled: bool = True) -> None:
+        """Include a source in queries again (or exclude it, with enabled=False)"""
+        position = self._position(tag)
+        if self._enabled[position] != enabled:
+            self._enabled[position] = enabled
+            self._changed()
+
+    def disable(self, tag: str) -> None:
+        """Leave a source out of queries until it is enabled again"""
+        self.enable(tag, False)
+
+    def _position(self, tag: str) -> int:
+        try:
+            return self._tags.index(tag)
+        except ValueError:
+            raise KeyError(f"Unknown source '{tag}'") from None
+
+    def _active(self) -> Iterator[PrefixIndex]:
+        return (index for index, enabled in zip(self._indexes, self._enabled) if enabled)
+
+    def locate(self, prefix: str, start: Any = None) -> Any:
+        if start is None:
+            parts = ((i, index.locate(prefix)) for i, index in enumerate(self._indexes) if self._enabled[i])
+        else:
+            # Positions in a cursor stay valid until the sources change, which bumps version
+            parts = ((i, self._indexes[i].locate(prefix, cursor)) for i, cursor in start)
+        cursor = tuple((i, part) for i, part in parts if part is not None)
+        return cursor or None
+
+    def _iter_tagged(self, cursor: Any, prefix: str) -> Iterator[Tuple[str, List[int]]]:
+        """Merge the sources' ranges in order, yielding each word with the positions of the sources that hold it"""
+        streams = [zip(self._indexes[i].iter_range(part, prefix), repeat(i)) for i, part in cursor]
+        for word, group in groupby(heapq.merge(*streams), key=itemgetter(0)):
+            yield word, [i for _, i in group]
+
+    def iter_range(self, cursor: Any, prefix: str) -> Iterator[str]:
+        for word, _ in self._iter_tagged(cursor, prefix):
+            yield word
+
+    def iter_children(self, cursor: Any, prefix: str) -> Iterator[Tuple[str, Any]]:
+        streams = [zip(self._indexes[i].iter_children(part, prefix), repeat(i)) for i, part in cursor]
+        # Keyed on the character alone, so cursors are never compared and ties keep source order
+        for ch, group in groupby(heapq.merge(*streams, key=_first_char), key=_first_char):
+            yield ch, tuple((i, child) for (_, child), i in group)
+
+    def iter_ranked_entries(self, cursor: Any, prefix: str) -> Iterator[Tuple[str, float]]:
+        streams = [self._indexes[i].iter_ranked_entries(part, prefix) for i, part in cursor]
+        seen = set()
+        for word, weight in heapq.merge(*streams, key=ranking_key):
+            # A word's first appearance is its best ranked one
+            if word not in seen:
+                seen.add(word)
+                yield word, weight
+
+    def autocomplete_tagged(self, prefix: str, limit: Optional[int] = None) -> List[Tuple[str, List[str]]]:
+        """
+        Get autocomplete suggestions together with the sources they come from
+
+        Args:
+            prefix: The prefix to search for
+            limit: Stop after this many matches (None returns all of them)
+
+        Returns:
+            (word, tags of the enabled sources containing it) pairs, in alphabetical order
+        """
+        prefix = prefix.lower()
+        if limit is not None and limit <= 0:
+            return []
+
+        cursor = self.locate(prefix)
+        if cursor is None:
+            return []
+        results = []
+        for word, positions in self._iter_tagged(cursor, prefix):
+            results.append((word, [self._tags[i] for i in positions]))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
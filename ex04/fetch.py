@@ -0,0 +1,155 @@
+"""
+Cached, conditional downloads of URL wordlists
+
+Every downloaded wordlist is kept in a local cache keyed by its URL, with
+the ETag and Last-Modified validators the server sent. The next fetch asks
+the server whether the list changed (If-None-Match / If-Modified-Since); an
+unchanged list is answered with 304 Not Modified and served from the cache
+without downloading it again. Bodies are requested gzip-compressed and
+decompressed while they stream to disk. A SHA-1 of every body is recorded,
+so snapshots built from a URL can tell whether the list they were built from
+is still current.
+"""
+
+import hashlib
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from atomic import atomic_write
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'autocomplete', 'downloads')
+# A copy validated this recently (in seconds) is used without asking the server again
+REVALIDATE_AFTER = 60.0
+CHUNK_SIZE = 1 << 16
+
+class FetchResult(NamedTuple):
+    """Where a fetched wordlist is, and how it was obtained"""
+    url: str
+    path: str
+    # 200 when downloaded, 304 when the server confirmed the cached copy, None if it wasn't
+    # asked or couldn't answer
+    status: Optional[int]
+    # SHA-1 of the (decompressed) body, identifying this version of the list
+    digest: str
+
+def cache_paths(url: str, cache_dir: str = CACHE_DIR) -> Tuple[str, str]:
+    """Body and metadata files of a URL's cache entry"""
+    name = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{name}.txt"), os.path.join(cache_dir, f"{name}.json")
+
+def _read_meta(meta_path: str, body_path: str, url: str) -> Optional[dict]:
+    """Metadata of a complete cache entry for url, or None"""
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('url') != url or not os.path.exists(body_path):
+        return None
+    return meta
+
+def _download(response, body_path: str) -> str:
+    """Stream a response body into the cache, decompressing gzip, and return its SHA-1"""
+    encoding = (response.headers.get('Content-Encoding') or response.headers.get('Transfer-Encoding') or '').lower()
+    # wbits 16 + MAX_WBITS expects a gzip header and trailer
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if 'gzip' in encoding else None
+    digest = hashlib.sha1()
+
+    with atomic_write(body_path) as f:
+        while True:
+            chunk = response.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            if decompressor is not None:
+                chunk = decompressor.decompress(chunk)
+            digest.update(chunk)
+            f.write(chunk)
+        if decompressor is not None:
+            tail = decompressor.flush()
+            digest.update(tail)
+            f.write(tail)
+    return digest.hexdigest()
+
+def fetch(url: str, cache_dir: str = CACHE_DIR, timeout: float = 30.0,
+          revalidate_after: float = REVALIDATE_AFTER) -> FetchResult:
+    """
+    Get a local copy of a URL's wordlist, downloading it only if it changed
+
+    If the server can't be reached, or fails with a 5xx error, but a cached
+    copy exists, the cached copy is used.
+
+    Args:
+        url: Wordlist URL
+        cache_dir: Directory of the download cache
+        timeout: Socket timeout in seconds
+        revalidate_after: Use a copy validated less than this many seconds ago without asking
+
+    Returns:
+        FetchResult with the path of the cached body
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    body_path, meta_path = cache_paths(url, cache_dir)
+    meta = _read_meta(meta_path, body_path, url)
+
+    if meta is not None and time.time() - meta.get('checked', 0.0) < revalidate_after:
+        return FetchResult(url, body_path, None, meta['digest'])
+
+    request = urllib.request.Request(url, headers={'Accept-Encoding': 'gzip'})
+    if meta is not None:
+        if meta.get('etag'):
+            request.add_header('If-None-Match', meta['etag'])
+        if meta.get('last_modified'):
+            request.add_header('If-Modified-Since', meta['last_modified'])
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            digest = _download(response, body_path)
+            meta = {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'digest': digest,
+            }
+            status = response.status
+    except urllib.error.HTTPError as e:
+        if meta is not None and e.code >= 500:
+            # A failing server is no better than an unreachable one; ask it again on the next fetch
+            return FetchResult(url, body_path, None, meta['digest'])
+        if e.code != 304 or meta is None:
+            raise
+        status = 304
+    except (urllib.error.URLError, OSError):
+        if meta is None:
+            raise
+        # Offline: the last copy we have is better than no wordlist
+        return FetchResult(url, body_path, None, meta['digest'])
+
+    meta['checked'] = time.time()
+    with atomic_write(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return FetchResult(url, body_path, status, meta['digest'])
+
+def fetch_many(urls: Iterable[str], max_workers: int = 8, **kwargs) -> Dict[str, FetchResult]:
+    """
+    Fetch several wordlists concurrently
+
+    Args:
+        urls: Wordlist URLs
+        max_workers: Maximum number of downloads in flight
+        **kwargs: Passed on to fetch
+
+    Returns:
+        FetchResult by URL (the first failure is raised once all have finished)
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(min(max_workers, len(urls))) as pool:
+        futures = {url: pool.submit(fetch, url, **kwargs) for url in urls}
+    return {url: future.result() for url, future in futures.items()}
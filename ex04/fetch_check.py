@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Check the download cache in fetch.py against a local HTTP stand-in
+
+Runs an http.server on 127.0.0.1 that serves a wordlist with an ETag and a
+Last-Modified date, gzip-compressed when asked, answers conditional requests
+with 304 and can be told to fail with 503. Every scenario is fetched into a
+temporary cache and printed as OK or FAIL; the exit status is 1 if any
+failed. Nothing goes over the network.
+
+    python fetch_check.py
+"""
+
+import gzip
+import hashlib
+import shutil
+import sys
+import tempfile
+import threading
+import urllib.error
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List
+
+from fetch import fetch
+
+class StandIn:
+    """A local server for one wordlist, recording the requests it gets"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.modified = formatdate(usegmt=True)
+        self.failing = False
+        # (method, If-None-Match, If-Modified-Since, Accept-Encoding) of every request
+        self.requests: List[tuple] = []
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                stand_in.handle(self)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/words.txt"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def etag(self) -> str:
+        return '"%s"' % hashlib.sha1(self.body).hexdigest()
+
+    def change(self, body: bytes) -> None:
+        self.body = body
+        self.modified = formatdate(usegmt=True)
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        headers = request.headers
+        self.requests.append((request.command, headers.get('If-None-Match'), headers.get('If-Modified-Since'),
+                              headers.get('Accept-Encoding')))
+        if self.failing:
+            request.send_error(503)
+            return
+        if headers.get('If-None-Match') == self.etag:
+            request.send_response(304)
+            request.send_header('ETag', self.etag)
+            request.end_headers()
+            return
+
+        data = self.body
+        compressed = 'gzip' in (headers.get('Accept-Encoding') or '')
+        if compressed:
+            data = gzip.compress(data)
+        request.send_response(200)
+        request.send_header('ETag', self.etag)
+        request.send_header('Last-Modified', self.modified)
+        if compressed:
+            request.send_header('Content-Encoding', 'gzip')
+        request.send_header('Content-Length', str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+def _read(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+def run_checks() -> bool:
+    """Run every scenario and print its outcome; True if they all passed"""
+    first = b"apple\nbanana\ncherry\n" * 50
+    second = b"apple\navocado\n" * 50
+    cache_dir = tempfile.mkdtemp(prefix='fetch-check-')
+    stand_in = StandIn(first)
+    url = stand_in.url
+    results: Dict[str, bool] = {}
+
+    def check(name: str, scenario: Callable[[], bool]) -> None:
+        try:
+            results[name] = bool(scenario())
+        except Exception as e:
+            print(f"  {name}: {e!r}")
+            results[name] = False
+        print(f"{'OK' if results[name] else 'FAIL':<6}{name}")
+
+    def download() -> bool:
+        result = fetch(url, cache_dir=cache_dir)
+        return (result.status == 200 and _read(result.path) == first
+                and result.digest == hashlib.sha1(first).hexdigest()
+                and stand_in.requests[-1][3] == 'gzip')
+
+    def fresh_copy() -> bool:
+        count = len(stand_in.requests)
+        result = fetch(url, cache_dir=cache_dir)
+        return result.status is None and len(stand_in.requests) == count
+
+    def not_modified() -> bool:
+        result = fetch(url, cache_dir=cache_dir, revalidate_after=0)
+        _, etag, modified_since, _ = stand_in.requests[-1]
+        return (result.status == 304 and etag == stand_in.etag and modified_since == stand_in.modified
+                and _read(result.path) == first)
+
+    def changed_body() -> bool:
+        old = fetch(url, cache_dir=cache_dir, revalidate_after=0).digest
+        stand_in.change(second)
+        result = fetch(url, cache_dir=cache_dir, revalidate_after=0)
+        return result.status == 200 and result.digest != old and _read(result.path) == second
+
+    def server_error_with_cache() -> bool:
+        stand_in.failing = True
+        try:
+            result = fetch(url, cache_dir=cache_dir, revalidate_after=0)
+        finally:
+            stand_in.failing = False
+        return result.status is None and _read(result.path) == second
+
+    def server_error_without_cache() -> bool:
+        stand_in.failing = True
+        try:
+            fetch(url, cache_dir=tempfile.mkdtemp(dir=cache_dir), revalidate_after=0)
+        except urllib.error.HTTPError as e:
+            return e.code == 503
+        finally:
+            stand_in.failing = False
+        return False
+
+    def offline() -> bool:
+        stand_in.close()
+        result = fetch(url, cache_dir=cache_dir, revalidate_after=0, timeout=2)
+        return result.status is None and _read(result.path) == second
+
+    try:
+        check("downloads gzip-compressed body", download)
+        check("serves a recently validated copy without asking", fresh_copy)
+        check("revalidates with If-None-Match / If-Modified-Since and gets 304", not_modified)
+        check("downloads a changed body again", changed_body)
+        check("falls back to the cache on a 5xx error", server_error_with_cache)
+        check("raises a 5xx error when nothing is cached", server_error_without_cache)
+        check("falls back to the cache when the server is gone", offline)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return all(results.values())
+
+if __name__ == "__main__":
+    sys.exit(0 if run_checks() else 1)
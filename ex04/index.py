@@ -0,0 +1,344 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from session import QuerySession
+
+# Index shared by the batch workers of a process pool, set once per worker
+_worker_index = None
+
+def _init_worker(index: 'PrefixIndex') -> None:
+    global _worker_index
+    _worker_index = index
+
+def _sweep_chunk(prefixes: List[str], limit: Optional[int]) -> List[Tuple[str, List[str]]]:
+    return list(_worker_index._sweep(prefixes, limit))
+
+def prefix_bound(prefix: str) -> Optional[str]:
+    """
+    Smallest string above every string that starts with prefix
+
+    That is the prefix with its last character incremented, which bounds the
+    prefix's range whatever characters follow it. Trailing U+10FFFF can't be
+    incremented and is dropped first.
+
+    Returns:
+        The exclusive upper bound, or None if there is none (the empty prefix,
+        or one made only of U+10FFFF)
+    """
+    stem = prefix.rstrip('\U0010ffff')
+    if not stem:
+        return None
+    return stem[:-1] + chr(ord(stem[-1]) + 1)
+
+def ranking_key(entry: Tuple[str, float]) -> Tuple[float, str]:
+    """Sort key putting (word, weight) pairs in iter_ranked_entries order"""
+    return -entry[1], entry[0]
+
+class PrefixIndex:
+    """
+    Query interface shared by the autocomplete backends
+
+    A backend implements two primitives around an opaque cursor that stands
+    for the range of words starting with some prefix:
+
+        locate(prefix, start)    -> cursor for prefix, or None if nothing matches
+        iter_range(cursor, prefix) -> the words in that range, in order
+
+    Every range is contained in the range of any shorter prefix, so locate can
+    start from the cursor of a shorter prefix instead of the root; sessions use
+    this to narrow their results one keystroke at a time.
+
+    Backends also implement iter_children(cursor, prefix), which lets the index
+    be walked like a trie; fuzzy_autocomplete is built on that walk.
+    """
+
+    # Bumped whenever the set of indexed words changes, so caches know to refresh
+    version = 0
+    # True when the backend stores word weights and iter_ranked orders by them
+    weighted = False
+
+    @classmethod
+    def from_sorted(cls, entries: Iterable[Tuple[str, float]], weighted: bool = False) -> 'PrefixIndex':
+        """
+        Build the index from words that are already normalized, sorted and unique
+
+        Lets words prepared elsewhere, such as the shards of a parallel build,
+        be indexed without reading and sorting them again.
+
+        Args:
+            entries: (word, weight) pairs in ascending word order
+            weighted: Keep the weights and rank suggestions by them
+
+        Returns:
+            A new index of this class
+        """
+        index = cls.__new__(cls)
+        index._init_sorted(entries, weighted)
+        return index
+
+    def _init_sorted(self, entries: Iterable[Tuple[str, float]], weighted: bool) -> None:
+        """Fill a new index from sorted, unique (word, weight) pairs (see from_sorted)"""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        """
+        Number of words in the index
+
+        This default walks every word; backends that know their size override it.
+        """
+        root = self.locate("")
+        return 0 if root is None else sum(1 for _ in self.iter_range(root, ""))
+
+    def locate(self, prefix: str, start: Any = None) -> Any:
+        """
+        Find the range of words starting with prefix
+
+        Args:
+            prefix: Lowercase prefix to search for
+            start: Cursor returned for a prefix of `prefix`, to narrow instead of
+                searching from scratch (None searches the whole index)
+
+        Returns:
+            Cursor for the matching range, or None if no word matches
+        """
+        raise NotImplementedError
+
+    def iter_range(self, cursor: Any, prefix: str) -> Iterator[str]:
+        """
+        Lazily yield the words of a range located for prefix, in alphabetical order
+
+        Args:
+            cursor: Cursor returned by locate(prefix)
+            prefix: The prefix the cursor was located for
+        """
+        raise NotImplementedError
+
+    def iter_children(self, cursor: Any, prefix: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Yield the one-character extensions of prefix that start some word
+
+        Args:
+            cursor: Cursor returned by locate(prefix)
+            prefix: The prefix the cursor was located for
+
+        Yields:
+            (character, cursor for prefix + character) in alphabetical order
+        """
+        raise NotImplementedError
+
+    def iter_ranked_entries(self, cursor: Any, prefix: str) -> Iterator[Tuple[str, float]]:
+        """
+        Lazily yield the words of a range with their weights, from highest to lowest weight
+
+        Ties are broken alphabetically. Without weights every word weighs the
+        same, so this is plain alphabetical order; weighted backends override it
+        with a search whose cost grows with the number of words taken, not with
+        the size of the range.
+
+        Args:
+            cursor: Cursor returned by locate(prefix)
+            prefix: The prefix the cursor was located for
+
+        Yields:
+            (word, weight) pairs
+        """
+        for word in self.iter_range(cursor, prefix):
+            yield word, 1.0
+
+    def iter_ranked(self, cursor: Any, prefix: str) -> Iterator[str]:
+        """
+        Lazily yield the words of a range from highest to lowest weight, ties alphabetically
+
+        Args:
+            cursor: Cursor returned by locate(prefix)
+            prefix: The prefix the cursor was located for
+        """
+        if not self.weighted:
+            return self.iter_range(cursor, prefix)
+        return map(itemgetter(0), self.iter_ranked_entries(cursor, prefix))
+
+    def top_k(self, prefix: str, k: int) -> List[str]:
+        """
+        Get the k highest-weighted words starting with a prefix
+
+        Args:
+            prefix: The prefix to search for
+            k: Number of words to return
+
+        Returns:
+            Up to k words, by descending weight and then alphabetically
+        """
+        prefix = prefix.lower()
+        if k <= 0:
+            return []
+
+        cursor = self.locate(prefix)
+        if cursor is None:
+            return []
+        return list(islice(self.iter_ranked(cursor, prefix), k))
+
+    def autocomplete(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Public method to get autocomplete suggestions for a prefix
+
+        Args:
+            prefix: The prefix to search for
+            limit: Stop after this many matches (None returns all of them)
+
+        Returns:
+            List of words that start with the prefix, in alphabetical order
+        """
+        prefix = prefix.lower()
+        if limit is not None and limit <= 0:
+            return []
+
+        cursor = self.locate(prefix)
+        if cursor is None:
+            return []
+        return list(islice(self.iter_range(cursor, prefix), limit))
+
+    def fuzzy_autocomplete(self, prefix: str, max_distance: int = 1,
+                           limit: Optional[int] = None) -> List[str]:
+        """
+        Get suggestions for a possibly mistyped prefix
+
+        A word matches if some prefix of it is within max_distance edits
+        (insertions, deletions, substitutions) of the typed prefix. The index
+        is walked like a trie, computing one Levenshtein row per node from its
+        parent's row, and a branch is abandoned as soon as no extension of it
+        can come within the distance or improve on a match already found above
+        it. Only nodes close to the typed prefix are ever visited.
+
+        Args:
+            prefix: The typed prefix
+            max_distance: Maximum number of edits
+            limit: Stop after this many words (None returns all of them)
+
+        Returns:
+            Matching words, closest first and alphabetical within a distance
+        """
+        prefix = prefix.lower()
+        if limit is not None and limit <= 0:
+            return []
+        root = self.locate("")
+        if root is None:
+            return []
+
+        n = len(prefix)
+        # Best subtrees as (distance, node prefix, cursor); a nested one only if strictly closer
+        matches: List[Tuple[int, str, Any]] = []
+        unmatched = max_distance + 1
+        stack = [("", root, list(range(n + 1)), unmatched)]
+
+        while stack:
+            node_prefix, cursor, row, best = stack.pop()
+            if row[-1] < best:
+                best = row[-1]
+                matches.append((best, node_prefix, cursor))
+            # Distances never shrink below a row's minimum further down the branch
+            if min(row) >= best:
+                continue
+
+            for ch, child in self.iter_children(cursor, node_prefix):
+                child_row = [row[0] + 1]
+                for j in range(1, n + 1):
+                    substitution = row[j - 1] + (prefix[j - 1] != ch)
+                    child_row.append(min(child_row[j - 1] + 1, row[j] + 1, substitution))
+                stack.append((node_prefix + ch, child, child_row, best))
+
+        results: List[str] = []
+        seen = set()
+        # Subtrees at the same distance are disjoint, so sorting by prefix keeps them alphabetical
+        for _, node_prefix, cursor in sorted(matches, key=lambda match: match[:2]):
+            for word in self.iter_range(cursor, node_prefix):
+                if word in seen:
+                    continue
+                seen.add(word)
+                results.append(word)
+                if limit is not None and len(results) >= limit:
+                    return results
+        return results
+
+    def session(self, limit: Optional[int] = None) -> QuerySession:
+        """
+        Start an incremental query session over this index
+
+        Args:
+            limit: Number of suggestions the session returns per prefix
+
+        Returns:
+            A new QuerySession positioned at the empty prefix
+        """
+        return QuerySession(self, limit)
+
+    def _sweep(self, prefixes: List[str], limit: Optional[int]) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Answer sorted, lowercase prefixes in one pass over the index
+
+        In sorted order every prefix follows the prefixes it extends, so the
+        cursors of the chain of prefixes leading to the current one are kept
+        on a stack and each query narrows its closest ancestor's range.
+        """
+        chain: List[Tuple[str, Any]] = []
+        for prefix in prefixes:
+            while chain and not prefix.startswith(chain[-1][0]):
+                chain.pop()
+
+            if not chain:
+                cursor = self.locate(prefix)
+            elif chain[-1][1] is None:
+                # The ancestor had no matches, so neither does this prefix
+                cursor = None
+            else:
+                cursor = self.locate(prefix, chain[-1][1])
+            chain.append((prefix, cursor))
+
+            if cursor is None or (limit is not None and limit <= 0):
+                yield prefix, []
+            else:
+                yield prefix, list(islice(self.iter_range(cursor, prefix), limit))
+
+    def iter_autocomplete_many(self, prefixes: Iterable[str], limit: Optional[int] = None,
+                               processes: Optional[int] = None) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Stream completions for a batch of prefixes
+
+        Args:
+            prefixes: Prefixes to complete (duplicates are answered once)
+            limit: Maximum number of completions per prefix
+            processes: If greater than 1, shard the sorted batch across a pool
+                of this many worker processes
+
+        Yields:
+            (lowercase prefix, completions) pairs in ascending prefix order
+        """
+        ordered = sorted({prefix.lower() for prefix in prefixes})
+        if not processes or processes <= 1:
+            yield from self._sweep(ordered, limit)
+            return
+
+        # Several contiguous chunks per worker keep them busy and each chunk a sweep
+        chunk_size = max(1, -(-len(ordered) // (processes * 4)))
+        chunks = [ordered[i:i + chunk_size] for i in range(0, len(ordered), chunk_size)]
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(self,)) as pool:
+            for part in pool.map(_sweep_chunk, chunks, repeat(limit)):
+                yield from part
+
+    def autocomplete_many(self, prefixes: Iterable[str], limit: Optional[int] = None,
+                          processes: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Get autocomplete suggestions for many prefixes at once
+
+        Args:
+            prefixes: Prefixes to complete
+            limit: Maximum number of completions per prefix
+            processes: If greater than 1, answer the batch with a pool of this many processes
+
+        Returns:
+            Mapping from each given prefix to its completions, in alphabetical order
+        """
+        prefixes = list(prefixes)
+        answers = dict(self.iter_autocomplete_many(prefixes, limit, processes))
+        return {prefix: answers[prefix.lower()] for prefix in prefixes}
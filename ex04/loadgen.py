@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Load generator for server.py
+
+Opens several concurrent connections, pipelines prefix queries on each of
+them and prints a JSON summary with throughput, client-side latency
+percentiles and the server's own statistics.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import string
+import time
+from typing import Any, Dict, List
+
+from server import latency_summary
+
+def make_prefixes(count: int, wordlist: str = None, seed: int = 0) -> List[str]:
+    """
+    Build the prefixes to send, typed out character by character like a user would
+
+    Args:
+        count: Number of prefixes
+        wordlist: File to draw words from (random letters if None)
+        seed: Random seed, so runs are repeatable
+
+    Returns:
+        List of prefixes
+    """
+    rng = random.Random(seed)
+    if wordlist:
+        with open(wordlist, 'r', encoding='utf-8') as f:
+            words = [line.strip() for line in f if line.strip()]
+    else:
+        words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+                 for _ in range(1000)]
+
+    prefixes: List[str] = []
+    while len(prefixes) < count:
+        word = rng.choice(words)
+        prefixes.extend(word[:i] for i in range(1, len(word) + 1))
+    return prefixes[:count]
+
+async def run_connection(host: str, port: int, prefixes: List[str], pipeline: int,
+                         limit: int, latencies: List[float]) -> int:
+    """
+    Send prefixes over one connection, pipeline requests at a time
+
+    Returns:
+        Number of error responses
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    errors = 0
+    try:
+        for batch_start in range(0, len(prefixes), pipeline):
+            batch = prefixes[batch_start:batch_start + pipeline]
+            sent_at = []
+            for i, prefix in enumerate(batch):
+                request = {'id': batch_start + i, 'prefix': prefix, 'limit': limit}
+                writer.write(json.dumps(request).encode('utf-8') + b'\n')
+                sent_at.append(time.perf_counter())
+            await writer.drain()
+
+            for started in sent_at:
+                response = json.loads(await reader.readline())
+                latencies.append(time.perf_counter() - started)
+                if 'error' in response:
+                    errors += 1
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return errors
+
+async def fetch_stats(host: str, port: int) -> Dict[str, Any]:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"id": "stats", "op": "stats"}\n')
+    response = json.loads(await reader.readline())
+    writer.close()
+    await writer.wait_closed()
+    return response.get('stats', {})
+
+async def run_load(host: str, port: int, connections: int, requests: int, pipeline: int,
+                   limit: int, wordlist: str = None, seed: int = 0) -> Dict[str, Any]:
+    """
+    Run the load test
+
+    Args:
+        host, port: Server address
+        connections: Number of concurrent connections
+        requests: Requests sent per connection
+        pipeline: Requests in flight per connection
+        limit: Suggestions requested per query
+        wordlist: File to draw prefixes from (random letters if None)
+        seed: Random seed
+
+    Returns:
+        Summary of the run
+    """
+    latencies: List[float] = []
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(
+        run_connection(host, port, make_prefixes(requests, wordlist, seed + c), pipeline, limit, latencies)
+        for c in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'connections': connections,
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'seconds': elapsed,
+        'throughput_rps': len(latencies) / elapsed if elapsed else 0.0,
+        'latency_ms': latency_summary(latencies),
+        'server': await fetch_stats(host, port),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate load against the autocomplete server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per connection")
+    parser.add_argument("--pipeline", type=int, default=8, help="requests in flight per connection")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--wordlist", help="file to draw prefixes from")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_load(args.host, args.port, args.connections, args.requests,
+                                   max(1, args.pipeline), args.limit, args.wordlist, args.seed))
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
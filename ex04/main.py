@@ -6,8 +6,13 @@ Exercise 4 - Lab02
 
 import sys
 import os
+from federated import FederatedIndex
+from fetch import fetch_many
 from search_engine import search_loop, initialize_search_engine
 
+ENGLISH_URL = "https://raw.githubusercontent.com/dwyl/english-words/refs/heads/master/words.txt"
+ROMANIAN_URL = "https://raw.githubusercontent.com/davidxbors/romanian_wordlists/refs/heads/master/wordlists/ro_50k.txt"
+
 def main():
     """Main function to run the search engine"""
     print("=== Search Engine Suggestions ===")
@@ -16,31 +21,56 @@ def main():
     print("2. Romanian wordlist (URL - 50k words)")
     print("3. Local file")
     print("4. Sample words (built-in)")
+    print("5. English and Romanian together (plus an optional local file)")
+    
+    choice = input("\nEnter your choice (1-5): ").strip()
     
-    choice = input("\nEnter your choice (1-4): ").strip()
+    print("\nChoose index backend:")
+    print("1. Binary search tree")
+    print("2. DAWG (compact trie)")
+    print("3. Sorted array (lowest memory)")
+    print("4. Snapshot (prebuilt on first run, memory-mapped afterwards)")
+    backend_choice = input("\nEnter your choice (1-4): ").strip()
+    backend = {"2": "dawg", "3": "sorted", "4": "mapped"}.get(backend_choice, "bst")
     
     if choice == "1":
         # English wordlist
-        url = "https://raw.githubusercontent.com/dwyl/english-words/refs/heads/master/words.txt"
-        bst = initialize_search_engine(url, "url")
+        bst = initialize_search_engine(ENGLISH_URL, "url", backend)
     
     elif choice == "2":
         # Romanian wordlist
-        url = "https://raw.githubusercontent.com/davidxbors/romanian_wordlists/refs/heads/master/wordlists/ro_50k.txt"
-        bst = initialize_search_engine(url, "url")
+        bst = initialize_search_engine(ROMANIAN_URL, "url", backend)
     
     elif choice == "3":
         # Local file
         filename = input("Enter path to wordlist file: ").strip()
+        weighted = input("Does each line end with a frequency? (y/N): ").strip().lower() == "y"
         if os.path.exists(filename):
-            bst = initialize_search_engine(filename, "file")
+            bst = initialize_search_engine(filename, "file", backend, weighted=weighted)
         else:
             print(f"File {filename} not found. Using sample words instead.")
-            bst = initialize_search_engine(None, "file")
+            bst = initialize_search_engine(None, "file", backend)
+    
+    elif choice == "5":
+        # Several wordlists, suggestions merged from all of them; download them side by side first
+        try:
+            fetch_many([ENGLISH_URL, ROMANIAN_URL])
+        except Exception as e:
+            print(f"Error downloading wordlists: {e}")
+        bst = FederatedIndex({
+            "english": initialize_search_engine(ENGLISH_URL, "url", backend),
+            "romanian": initialize_search_engine(ROMANIAN_URL, "url", backend),
+        })
+        filename = input("Enter path to a custom wordlist file (leave empty to skip): ").strip()
+        if filename:
+            if os.path.exists(filename):
+                bst.add_source("custom", initialize_search_engine(filename, "file", backend))
+            else:
+                print(f"File {filename} not found. Continuing without it.")
     
     else:
         # Sample words
-        bst = initialize_search_engine(None, "file")
+        bst = initialize_search_engine(None, "file", backend)
     
     print("\nStarting search engine...")
     print("Type to see autocomplete suggestions")
@@ -0,0 +1,125 @@
+"""
+Terminal output and keyboard input for the interactive search loop
+
+Renderer repaints only the lines that changed since the previous frame, with
+ANSI cursor movement, in a single write. KeyReader keeps the terminal in raw
+mode for the whole session and returns every keystroke that is already
+waiting at once, so a paste or key repeat costs one query and one redraw.
+"""
+
+import codecs
+import os
+import sys
+import time
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import select
+    import termios
+    import tty
+
+ESC = '\x1b'
+
+class Renderer:
+    """Diffing full-screen renderer"""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stdout
+        self.lines: List[str] = []
+        self.last_frame_ms = 0.0
+        self._cleared = False
+        if os.name == 'nt':
+            # Turns on ANSI escape processing in the Windows console
+            os.system('')
+
+    def render(self, lines: List[str], cursor: Optional[Tuple[int, int]] = None) -> float:
+        """
+        Draw a frame, touching only the lines that differ from the last one
+
+        Args:
+            lines: Full contents of the screen, top to bottom
+            cursor: (row, column), 0-based, to leave the cursor at
+
+        Returns:
+            Time spent building and writing the frame, in milliseconds
+        """
+        start = time.perf_counter()
+        out = []
+        if not self._cleared:
+            out.append(f"{ESC}[H{ESC}[2J")
+            self._cleared = True
+
+        for row, line in enumerate(lines):
+            if row >= len(self.lines) or self.lines[row] != line:
+                out.append(f"{ESC}[{row + 1};1H{line}{ESC}[K")
+        for row in range(len(lines), len(self.lines)):
+            out.append(f"{ESC}[{row + 1};1H{ESC}[K")
+
+        if cursor is not None:
+            out.append(f"{ESC}[{cursor[0] + 1};{cursor[1] + 1}H")
+
+        self.stream.write(''.join(out))
+        self.stream.flush()
+        self.lines = list(lines)
+
+        self.last_frame_ms = (time.perf_counter() - start) * 1000
+        return self.last_frame_ms
+
+    def close(self) -> None:
+        """Move the cursor below the last frame so normal output can continue"""
+        self.stream.write(f"{ESC}[{len(self.lines) + 1};1H\r\n")
+        self.stream.flush()
+
+class KeyReader:
+    """Raw-mode keyboard input, used as a context manager around the session"""
+
+    def __enter__(self) -> 'KeyReader':
+        if os.name != 'nt':
+            self._fd = sys.stdin.fileno()
+            self._old_settings = termios.tcgetattr(self._fd)
+            tty.setraw(self._fd)
+            self._decoder = codecs.getincrementaldecoder('utf-8')('ignore')
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if os.name != 'nt':
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._old_settings)
+
+    def read(self) -> str:
+        """
+        Wait for a keystroke and return it with everything typed since
+
+        Returns:
+            The pending input, possibly several characters long
+        """
+        if os.name == 'nt':
+            chars = [msvcrt.getwch()]
+            while msvcrt.kbhit():
+                chars.append(msvcrt.getwch())
+            return ''.join(chars)
+
+        data = os.read(self._fd, 4096)
+        while select.select([self._fd], [], [], 0)[0]:
+            data += os.read(self._fd, 4096)
+        return self._decoder.decode(data)
+
+def iter_keys(burst: str) -> Iterator[str]:
+    """
+    Split raw input into keys, keeping each escape sequence (arrow keys etc.) together
+
+    A lone ESC is yielded as a key of its own.
+    """
+    i = 0
+    while i < len(burst):
+        if burst[i] == ESC and i + 1 < len(burst) and burst[i + 1] in '[O':
+            # CSI/SS3 sequence: runs up to its final byte in '@'..'~'
+            end = i + 2
+            while end < len(burst) and not ('@' <= burst[end] <= '~'):
+                end += 1
+            yield burst[i:end + 1]
+            i = end + 1
+        else:
+            yield burst[i]
+            i += 1
@@ -1,103 +1,139 @@
-import os
-import sys
-import termios
-import tty
-import msvcrt
+import time
+from functools import partial
 from typing import List
 
 from BTS import BST
+from cache import CachedIndex
+from dawg import DAWG
+from render import ESC, KeyReader, Renderer, iter_keys
+from sharded import build_sharded
+from snapshot import load_or_build
+from sorted_index import SortedIndex
 
-def clear_screen():
-    """Clear the terminal screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
-
-def get_char() -> str:
-    """
-    Get a single character from user input without requiring Enter key
-    
-    Returns:
-        Single character input
-    """
-    if os.name == 'nt':  # Windows
-        return msvcrt.getch().decode('utf-8')
-    else:  # Unix-like systems
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(sys.stdin.fileno())
-            ch = sys.stdin.read(1)
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return ch
+# Index backends selectable from initialize_search_engine
+BACKENDS = {
+    'bst': BST,
+    'dawg': DAWG,
+    'sorted': SortedIndex,
+    'mapped': load_or_build,
+}
 
 def search_loop(bst: BST):
     """
     Main search loop that provides real-time autocomplete
     
+    Keystrokes that arrive together (a paste, key repeat) are applied at once
+    and answered with one query and one redraw, and only the screen lines that
+    changed are repainted.
+    
     Args:
-        bst: Initialized BST instance with wordlist
+        bst: Initialized index instance (any backend) with wordlist
     """
     current_input = ""
     suggestions: List[str] = []
+    message = ""
+    # Narrows the previous keystroke's range instead of searching from the root
+    session = bst.session(limit=10)  # Show top 10
+    renderer = Renderer()
     
-    print("=== Real-time Search Engine ===")
-    print("Start typing to get autocomplete suggestions")
-    print("Press TAB to autocomplete, BACKSPACE to delete, ESC to exit")
-    print("-" * 50)
+    def suggest(text: str):
+        """Heading and suggestions for the input, falling back to typo-tolerant search"""
+        session.set_prefix(text)
+        found = session.suggestions()
+        if found:
+            return "Suggestions:", found
+        # Tolerate a typo in what was typed so far
+        return "Did you mean:", bst.fuzzy_autocomplete(text, max_distance=1, limit=10)
     
-    while True:
-        # Clear and display current state
-        clear_screen()
-        print("=== Real-time Search Engine ===")
-        print("Start typing to get autocomplete suggestions")
-        print("Press TAB to autocomplete, BACKSPACE to delete, ESC to exit")
-        print("-" * 50)
-        print(f"Input: {current_input}")
-        print("-" * 50)
-        
-        # Show suggestions
-        if current_input:
-            suggestions = bst.autocomplete(current_input)
-            if suggestions:
-                print("Suggestions:")
-                for i, suggestion in enumerate(suggestions[:10]):  # Show top 10
-                    print(f"  {i+1}. {suggestion}")
+    with KeyReader() as keys:
+        while True:
+            start = time.perf_counter()
+            lines = [
+                "=== Real-time Search Engine ===",
+                "Start typing to get autocomplete suggestions",
+                "Press TAB to autocomplete, BACKSPACE to delete, ESC to exit",
+                "-" * 50,
+                f"Input: {current_input}",
+                "-" * 50,
+            ]
+            
+            # Show suggestions
+            if current_input:
+                heading, suggestions = suggest(current_input)
+                if suggestions:
+                    lines.append(heading)
+                    for i, suggestion in enumerate(suggestions):
+                        lines.append(f"  {i+1}. {suggestion}")
+                else:
+                    lines.append("No suggestions found")
             else:
-                print("No suggestions found")
-        else:
-            print("Type something to get suggestions...")
-        
-        # Get user input
-        print("\nType a character (ESC to exit): ", end='', flush=True)
-        char = get_char()
-        
-        if ord(char) == 27:  # ESC key
-            print("\nExiting search engine...")
-            break
-        elif char == '\t':  # TAB key - autocomplete
-            if suggestions:
-                current_input = suggestions[0]
-        elif ord(char) == 127 or ord(char) == 8:  # BACKSPACE/DELETE key
-            current_input = current_input[:-1]
-        elif char == '\n' or char == '\r':  # ENTER key
-            if current_input and current_input in bst.autocomplete(current_input):
-                print(f"\nYou selected: {current_input}")
-                input("Press Enter to continue...")
-                current_input = ""
-        elif char.isprintable():
-            current_input += char
+                lines.append("Type something to get suggestions...")
+            query_ms = (time.perf_counter() - start) * 1000
+            
+            lines.append("")
+            lines.append(message or "Type a character (ESC to exit): ")
+            lines.append(f"(query {query_ms:.2f} ms, last frame {renderer.last_frame_ms:.2f} ms)")
+            renderer.render(lines, cursor=(4, len("Input: ") + len(current_input)))
+            message = ""
+            
+            # Get user input: everything typed since the last frame
+            stale = False
+            for key in iter_keys(keys.read()):
+                if stale and key in ('\t', '\n', '\r'):
+                    # TAB and ENTER act on the input as edited by the keys before them
+                    _, suggestions = suggest(current_input) if current_input else ("", [])
+                    stale = False
+                
+                if key == ESC:
+                    renderer.close()
+                    print("Exiting search engine...")
+                    return
+                elif len(key) > 1:  # Arrow or function key
+                    continue
+                elif key == '\t':  # TAB key - autocomplete (extends the current range)
+                    if suggestions:
+                        current_input = suggestions[0]
+                elif ord(key) == 127 or ord(key) == 8:  # BACKSPACE/DELETE key
+                    current_input = current_input[:-1]
+                elif key == '\n' or key == '\r':  # ENTER key
+                    # Suggestions may be ranked by weight, but alphabetically an exact
+                    # match is always the first word of its own prefix range
+                    if current_input and bst.autocomplete(current_input, limit=1) == [current_input]:
+                        message = f"You selected: {current_input}"
+                        current_input = ""
+                elif key.isprintable():
+                    current_input += key
+                stale = True
 
-def initialize_search_engine(source: str = None, source_type: str = "url") -> BST:
+def initialize_search_engine(source: str = None, source_type: str = "url", backend: str = "bst",
+                             cache_entries: int = 0, weighted: bool = False, processes: int = 0,
+                             cache_bytes: int = 16 * 1024 * 1024):
     """
     Initialize the search engine with a wordlist
     
     Args:
         source: URL or file path to wordlist
-        source_type: 'url' or 'file'
+        source_type: 'url', 'file' or 'stdin'
+        backend: Index backend, one of BACKENDS ('bst', 'dawg', 'sorted' or 'mapped')
+        cache_entries: If positive, put an LRU cache of this many queries in front of autocomplete
+            and sessions
+        weighted: Read a frequency column after each word and suggest the most frequent
+            words first (honored by the 'bst' and 'sorted' backends)
+        processes: If greater than 1, normalize and sort the wordlist in this many
+            processes and stitch the shards into one index (not for 'mapped')
+        cache_bytes: Memory budget of that cache, in bytes
         
     Returns:
-        Initialized BST instance
+        Initialized index instance exposing autocomplete(prefix, limit)
     """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', choose from: {', '.join(BACKENDS)}")
+    build_index = BACKENDS[backend]
+    if processes > 1:
+        if not hasattr(build_index, 'from_sorted'):
+            raise ValueError(f"The '{backend}' backend can't be built in parallel")
+        build_index = partial(build_sharded, index_class=build_index, processes=processes, stitch=True)
+    
     if source is None:
         # Use default wordlists
         if source_type == "url":
@@ -108,12 +144,19 @@ def initialize_search_engine(source: str = None, source_type: str = "url") -> BS
             source = "wordlist.txt"
     
     try:
+        start = time.perf_counter()
         if source_type == "url":
-            bst = BST(source, url=True)
+            bst = build_index(source, url=True, weighted=weighted)
+        elif source_type == "stdin":
+            bst = build_index(source, stdin=True, weighted=weighted)
         else:
-            bst = BST(source, file=True)
+            bst = build_index(source, file=True, weighted=weighted)
+        elapsed = time.perf_counter() - start
         
-        print(f"Search engine initialized with {len(bst.autocomplete(''))} words")
+        print(f"Search engine initialized with {len(bst)} words "
+              f"({backend}, built in {elapsed:.2f}s)")
+        if cache_entries > 0:
+            bst = CachedIndex(bst, max_entries=cache_entries, max_bytes=cache_bytes)
         return bst
         
     except Exception as e:
@@ -149,4 +192,4 @@ def initialize_search_engine(source: str = None, source_type: str = "url") -> BS
             yard year yellow yes yesterday
             zero zone zoo zoom zulu
         """
-        return BST(sample_words)
\ No newline at end of file
+        return build_index(sample_words)
\ No newline at end of file
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Autocomplete server over line-delimited JSON on TCP
+
+Each request is one JSON object per line and gets exactly one JSON line
+back, in the order the requests were sent, so clients may pipeline:
+
+    {"id": 1, "prefix": "app", "limit": 5}
+    -> {"id": 1, "results": ["app", "apple", ...], "elapsed_us": 12.3}
+
+    {"id": 2, "op": "stats"}
+    -> {"id": 2, "stats": {"requests": ..., "latency_ms": {...}, ...}}
+
+All connections share one in-memory index. Try it with loadgen.py.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List
+
+from search_engine import BACKENDS, initialize_search_engine
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 1000
+MAX_LINE = 64 * 1024
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 if it is empty)"""
+    if not ordered:
+        return 0.0
+    rank = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+def latency_summary(seconds: Iterable[float]) -> Dict[str, float]:
+    """p50, p95, p99 and max of latency samples given in seconds, in milliseconds"""
+    ordered = sorted(seconds)
+    return {
+        'p50': 1000 * percentile(ordered, 0.50),
+        'p95': 1000 * percentile(ordered, 0.95),
+        'p99': 1000 * percentile(ordered, 0.99),
+        'max': 1000 * ordered[-1] if ordered else 0.0,
+    }
+
+class LatencyStats:
+    """Request counters and latency percentiles over a sliding window of recent requests"""
+
+    def __init__(self, window: int = 10000):
+        self.samples: deque = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.requests += 1
+        self.total_seconds += seconds
+        self.samples.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Totals since startup and percentiles, in milliseconds, over the window
+        """
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'mean_ms': 1000 * self.total_seconds / self.requests if self.requests else 0.0,
+            'latency_ms': latency_summary(self.samples),
+        }
+
+class AutocompleteServer:
+    """Serves prefix queries from many concurrent clients against one shared index"""
+
+    def __init__(self, index, host: str = "127.0.0.1", port: int = 8765):
+        self.index = index
+        self.host = host
+        self.port = port
+        self.stats = LatencyStats()
+        self.connections = 0
+
+    def handle_request(self, line: bytes) -> Dict[str, Any]:
+        """
+        Answer one request line
+
+        Args:
+            line: Raw JSON request
+
+        Returns:
+            The JSON-serializable response
+        """
+        start = time.perf_counter()
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            request_id = request.get('id')
+
+            if request.get('op') == 'stats':
+                stats = self.stats.snapshot()
+                stats['connections'] = self.connections
+                if hasattr(self.index, 'stats'):
+                    stats['cache'] = self.index.stats()
+                return {'id': request_id, 'stats': stats}
+
+            prefix = request.get('prefix')
+            if not isinstance(prefix, str):
+                raise ValueError("'prefix' must be a string")
+            limit = request.get('limit', DEFAULT_LIMIT)
+            # JSON true and false are ints to Python
+            if isinstance(limit, bool) or not isinstance(limit, int) or limit < 0:
+                raise ValueError("'limit' must be a non-negative integer")
+
+            results = self.index.autocomplete(prefix, min(limit, MAX_LIMIT))
+        except ValueError as e:
+            self.stats.errors += 1
+            return {'id': request_id, 'error': str(e)}
+
+        elapsed = time.perf_counter() - start
+        self.stats.record(elapsed)
+        return {'id': request_id, 'results': results, 'elapsed_us': round(elapsed * 1e6, 1)}
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer pipelined requests from one connection until it closes"""
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line longer than the stream limit; there's no way to resync
+                    self.stats.errors += 1
+                    writer.write(b'{"id": null, "error": "request line too long"}\n')
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                response = self.handle_request(line)
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                # Returns immediately unless the client stopped reading
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self) -> None:
+        """Listen until cancelled"""
+        server = await asyncio.start_server(self.handle_client, self.host, self.port, limit=MAX_LINE)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Serving autocomplete on {addresses}")
+        async with server:
+            await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve autocomplete suggestions over TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--source", help="URL or file path of the wordlist (defaults to the English list)")
+    parser.add_argument("--source-type", choices=["url", "file"], default="url")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="sorted")
+    parser.add_argument("--cache", type=int, default=0, metavar="ENTRIES",
+                        help="LRU cache size in queries (0 disables caching)")
+    parser.add_argument("--cache-mb", type=float, default=16, metavar="MB",
+                        help="memory budget of the LRU cache, in megabytes")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="build the index in this many processes (0 builds it in this one)")
+    args = parser.parse_args()
+
+    index = initialize_search_engine(args.source, args.source_type, args.backend, args.cache,
+                                     processes=args.processes, cache_bytes=int(args.cache_mb * 1024 * 1024))
+    server = AutocompleteServer(index, args.host, args.port)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+
+if __name__ == "__main__":
+    main()
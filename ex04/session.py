@@ -0,0 +1,77 @@
+from itertools import islice
+from typing import Any, List, Optional
+
+class QuerySession:
+    """
+    Incremental autocomplete state for one user typing a query
+
+    Keeps one cursor per prefix length. Typing a character narrows the cursor
+    of the previous prefix, backspace pops back to the cached one, so each
+    keystroke costs about as much as a single-character search regardless of
+    the dictionary size.
+    """
+
+    def __init__(self, index, limit: Optional[int] = None):
+        """
+        Args:
+            index: A PrefixIndex backend
+            limit: Number of suggestions returned per prefix (None for all)
+        """
+        self.index = index
+        self.limit = limit
+        self.prefix = ""
+        self._cursors: List[Any] = [index.locate("")]
+        self._version = index.version
+
+    def _sync(self) -> None:
+        """Locate the cursors again if the index changed since they were computed"""
+        if self.index.version != self._version:
+            prefix = self.prefix
+            self.prefix = ""
+            self._cursors = [self.index.locate("")]
+            self._version = self.index.version
+            self.type(prefix)
+
+    @property
+    def cursor(self) -> Any:
+        """Cursor of the current prefix, or None if nothing matches it"""
+        return self._cursors[-1]
+
+    def type(self, text: str) -> None:
+        """Append text to the current prefix, narrowing the range one character at a time"""
+        self._sync()
+        for ch in text.lower():
+            self.prefix += ch
+            cursor = self._cursors[-1]
+            # Once nothing matches, no longer prefix can match either
+            self._cursors.append(None if cursor is None else self.index.locate(self.prefix, cursor))
+
+    def backspace(self, count: int = 1) -> None:
+        """Remove up to count characters, restoring the cached cursor of the shorter prefix"""
+        count = min(count, len(self.prefix))
+        if count > 0:
+            del self._cursors[-count:]
+            self.prefix = self.prefix[:-count]
+
+    def set_prefix(self, prefix: str) -> None:
+        """Move to an arbitrary prefix, reusing the cursors of the shared leading part"""
+        prefix = prefix.lower()
+        common = 0
+        shortest = min(len(prefix), len(self.prefix))
+        while common < shortest and prefix[common] == self.prefix[common]:
+            common += 1
+
+        self.backspace(len(self.prefix) - common)
+        self.type(prefix[common:])
+
+    def suggestions(self) -> List[str]:
+        """
+        Returns:
+            Up to limit words starting with the current prefix, highest weight
+            first on weighted indexes and alphabetical otherwise
+        """
+        self._sync()
+        cursor = self._cursors[-1]
+        if cursor is None or (self.limit is not None and self.limit <= 0):
+            return []
+        return list(islice(self.index.iter_ranked(cursor, self.prefix), self.limit))
@@ -0,0 +1,248 @@
+"""
+Parallel index building, sharded by the leading character of the words
+
+The wordlist is cut into chunks that worker processes normalize and
+deduplicate, spilling one sorted run per leading character. Leading
+characters are then grouped into contiguous shards of about the same size,
+and each shard's runs are merged, again in a worker, into its own sorted
+word list. Because the shards cover disjoint, ordered character ranges, the
+shard lists laid end to end are the sorted list of the whole wordlist, so
+they can be stitched into a single index, or kept apart as the indexes of a
+ShardedIndex that routes each prefix to the one shard that can match it.
+"""
+
+import heapq
+import os
+import shutil
+import tempfile
+from bisect import bisect_right
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import chain, islice, repeat
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from BTS import BST
+from fetch import fetch
+from index import PrefixIndex, ranking_key
+from wordlist import iter_lines, merge_runs, parse_entry, read_run, write_run
+
+# Lines per chunk handed to a worker when the source is not a local file
+CHUNK_LINES = 200_000
+
+def _spill_buckets(lines: Iterable[str], weighted: bool, directory: str, chunk: int) -> Dict[str, Tuple[str, int]]:
+    """
+    Normalize and deduplicate lines, writing one sorted run per leading character
+
+    Returns:
+        Mapping from leading character to (run file, number of words in it)
+    """
+    buckets: Dict[str, Dict[str, float]] = {}
+    for line in lines:
+        word, weight = parse_entry(line, weighted)
+        if word:
+            seen = buckets.setdefault(word[0], {})
+            seen[word] = seen.get(word, 0.0) + weight
+
+    runs = {}
+    for lead, seen in buckets.items():
+        path = os.path.join(directory, f"{chunk}-{ord(lead)}.run")
+        with open(path, 'w', encoding='utf-8') as run:
+            write_run(run, sorted(seen.items()))
+        runs[lead] = (path, len(seen))
+    return runs
+
+def _map_lines(lines: List[str], weighted: bool, directory: str, chunk: int) -> Dict[str, Tuple[str, int]]:
+    return _spill_buckets(lines, weighted, directory, chunk)
+
+def _map_file_range(path: str, start: int, end: int, weighted: bool, directory: str,
+                    chunk: int) -> Dict[str, Tuple[str, int]]:
+    """Spill the lines of a file that begin in the byte range [start, end)"""
+
+    def lines() -> Iterator[str]:
+        with open(path, 'rb') as f:
+            position = start
+            if start > 0:
+                # The line running across start belongs to the previous range
+                f.seek(start - 1)
+                position += len(f.readline()) - 1
+            while position < end:
+                line = f.readline()
+                if not line:
+                    break
+                position += len(line)
+                yield line.decode('utf-8')
+
+    return _spill_buckets(lines(), weighted, directory, chunk)
+
+def _reduce_shard(bucket_runs: List[List[str]], index_class: Optional[type], weighted: bool) -> Any:
+    """
+    Merge the runs of a shard's leading characters, in order, into its sorted entries
+
+    Returns:
+        The shard's index if index_class is given, otherwise its (word, weight) list
+    """
+    entries: List[Tuple[str, float]] = []
+    for paths in bucket_runs:
+        runs = [open(path, 'r', encoding='utf-8') for path in paths]
+        try:
+            entries.extend(merge_runs(read_run(run) for run in runs))
+        finally:
+            for run in runs:
+                run.close()
+
+    if index_class is None:
+        return entries
+    return index_class.from_sorted(entries, weighted)
+
+def _group_buckets(counts: Dict[str, int], shards: int) -> List[List[str]]:
+    """Split the leading characters, in order, into at most shards groups of similar word counts"""
+    total = sum(counts.values())
+    groups: List[List[str]] = []
+    current: List[str] = []
+    filled = 0
+    for lead in sorted(counts):
+        current.append(lead)
+        filled += counts[lead]
+        # Close a group once the groups so far hold their share of the words
+        if len(groups) < shards - 1 and filled * shards >= total * (len(groups) + 1):
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    return groups
+
+def _map(pool: ProcessPoolExecutor, processes: int, source: str, weighted: bool, directory: str,
+         **kwargs) -> List[Dict[str, Tuple[str, int]]]:
+    """Run the normalize-and-spill phase over the whole source"""
+    if kwargs.get('url', False):
+        # Downloaded lists are cached on disk, so they can be split like a local file
+        source, kwargs = fetch(source).path, {'file': True}
+    if kwargs.get('file', False):
+        # Workers read their own byte ranges, so the file is never funneled through this process
+        size = os.path.getsize(source)
+        step = max(1, -(-size // (processes * 4)))
+        futures = [pool.submit(_map_file_range, source, start, min(size, start + step), weighted, directory, chunk)
+                   for chunk, start in enumerate(range(0, size, step))]
+        return [future.result() for future in futures]
+
+    futures = []
+    pending = set()
+    lines = iter_lines(source, **kwargs)
+    for chunk, batch in enumerate(iter(lambda: list(islice(lines, CHUNK_LINES)), [])):
+        # Only read ahead a couple of chunks per worker, so memory stays bounded
+        if len(pending) >= 2 * processes:
+            _, pending = wait(pending, return_when=FIRST_COMPLETED)
+        future = pool.submit(_map_lines, batch, weighted, directory, chunk)
+        futures.append(future)
+        pending.add(future)
+    return [future.result() for future in futures]
+
+def build_sharded(source: str, index_class: type = BST, processes: Optional[int] = None,
+                  stitch: bool = False, **kwargs) -> PrefixIndex:
+    """
+    Build an index with the wordlist split across worker processes
+
+    Args:
+        source: URL, file path, or a string of words (see wordlist.iter_lines)
+        index_class: Backend to build, one with from_sorted (BST, DAWG or SortedIndex)
+        processes: Worker processes, and the number of shards (defaults to the CPU count)
+        stitch: Join the shards into one index_class instead of returning a ShardedIndex
+        **kwargs: url=True, file=True or stdin=True, and weighted=True, as for the backends
+
+    Returns:
+        A single index_class index if stitch is set, otherwise a ShardedIndex over them
+    """
+    if not hasattr(index_class, 'from_sorted'):
+        raise ValueError(f"{getattr(index_class, '__name__', index_class)} can't be built from sorted shards")
+    processes = processes or os.cpu_count() or 1
+    weighted = kwargs.pop('weighted', False)
+
+    directory = tempfile.mkdtemp(prefix='shards-')
+    try:
+        with ProcessPoolExecutor(processes) as pool:
+            counts: Dict[str, int] = {}
+            paths: Dict[str, List[str]] = {}
+            for runs in _map(pool, processes, source, weighted, directory, **kwargs):
+                for lead, (path, count) in runs.items():
+                    counts[lead] = counts.get(lead, 0) + count
+                    paths.setdefault(lead, []).append(path)
+
+            groups = _group_buckets(counts, processes)
+            shards = list(pool.map(_reduce_shard, [[paths[lead] for lead in group] for group in groups],
+                                   repeat(None if stitch else index_class), repeat(weighted)))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    if stitch:
+        return index_class.from_sorted(chain.from_iterable(shards), weighted)
+    return ShardedIndex(shards, [group[0] for group in groups], weighted)
+
+class ShardedIndex(PrefixIndex):
+    """
+    Router over indexes that each hold a contiguous range of leading characters
+
+    Shard i holds the words whose first character is at least bounds[i] and
+    below bounds[i + 1]. A non-empty prefix can only match words in the shard
+    of its first character, so it is sent to that shard alone. Cursors are
+    (shard number, shard cursor), except for the empty prefix, which spans
+    every shard and gets (None, tuple of (shard number, shard cursor)).
+    """
+
+    def __init__(self, shards: List[PrefixIndex], bounds: List[str], weighted: bool = False):
+        """
+        Args:
+            shards: Indexes in ascending order of the characters they cover
+            bounds: Lowest leading character of each shard
+            weighted: Whether the shards rank suggestions by weight
+        """
+        self.shards = shards
+        self.bounds = bounds
+        self.weighted = weighted
+
+    @property
+    def version(self) -> int:
+        return sum(shard.version for shard in self.shards)
+
+    def __len__(self) -> int:
+        # Shards split the words by their first character, so none is counted twice
+        return sum(len(shard) for shard in self.shards)
+
+    def locate(self, prefix: str, start: Any = None) -> Any:
+        if not prefix:
+            parts = tuple((i, cursor) for i, cursor in
+                          ((i, shard.locate("")) for i, shard in enumerate(self.shards)) if cursor is not None)
+            return (None, parts) if parts else None
+
+        if start is not None and start[0] is not None:
+            # Narrowing within a shard
+            shard, cursor = start
+            cursor = self.shards[shard].locate(prefix, cursor)
+        else:
+            shard = bisect_right(self.bounds, prefix[0]) - 1
+            if shard < 0:
+                return None
+            cursor = self.shards[shard].locate(prefix)
+        return None if cursor is None else (shard, cursor)
+
+    def iter_range(self, cursor: Any, prefix: str) -> Iterator[str]:
+        shard, inner = cursor
+        if shard is not None:
+            yield from self.shards[shard].iter_range(inner, prefix)
+            return
+        # Shards cover ascending character ranges, so their words follow one another in order
+        for i, part in inner:
+            yield from self.shards[i].iter_range(part, prefix)
+
+    def iter_children(self, cursor: Any, prefix: str) -> Iterator[Tuple[str, Any]]:
+        shard, inner = cursor
+        parts = ((shard, inner),) if shard is not None else inner
+        for i, part in parts:
+            for ch, child in self.shards[i].iter_children(part, prefix):
+                yield ch, (i, child)
+
+    def iter_ranked_entries(self, cursor: Any, prefix: str) -> Iterator[Tuple[str, float]]:
+        shard, inner = cursor
+        if shard is not None:
+            yield from self.shards[shard].iter_ranked_entries(inner, prefix)
+            return
+        yield from heapq.merge(*(self.shards[i].iter_ranked_entries(part, prefix) for i, part in inner),
+                               key=ranking_key)
@@ -0,0 +1,287 @@
+"""
+On-disk snapshots of a built index, queried in place through mmap
+
+A snapshot file is a fixed 64-byte header followed by count + 1 little-endian
+uint32 byte offsets and the UTF-8 encoded words, sorted and back to back:
+
+    magic, format version, word count, data size, CRC-32 of everything after
+    the header, SHA-1 digest of the source the snapshot was built from
+
+UTF-8 preserves code point order under bytewise comparison, so queries bisect
+directly over the mapped bytes and only decode the words they return.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional, Tuple
+
+from atomic import atomic_write
+from fetch import fetch
+from index import PrefixIndex, prefix_bound
+from wordlist import iter_sorted_words
+
+MAGIC = b'WORDIDX\x00'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sHxxQQI20s12x')
+
+SNAPSHOT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'autocomplete')
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is missing, corrupt, outdated or built from another source"""
+
+def source_key(source: str, **kwargs) -> str:
+    """
+    Describe a wordlist source so that a change to it invalidates its snapshot
+
+    Args:
+        source: URL, file path or string of words, as passed to the index
+        **kwargs: url=True or file=True, and weighted=True, as passed to the index
+
+    Returns:
+        A string identifying the source, for files and URLs its current version,
+        and whether a weight column was split off the words
+    """
+    # Unweighted, a frequency column stays part of the word, so the two parses index different words
+    suffix = ":weighted" if kwargs.get('weighted', False) else ""
+    if kwargs.get('url', False):
+        # Revalidated with the server, so a changed list gets a new key
+        return f"url:{source}:{fetch(source).digest}{suffix}"
+    if kwargs.get('stdin', False):
+        return "stdin" + suffix
+    if kwargs.get('file', False):
+        stat = os.stat(source)
+        return f"file:{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}{suffix}"
+    return "text:" + hashlib.sha1(source.encode('utf-8')).hexdigest() + suffix
+
+def default_snapshot_path(source: str, **kwargs) -> str:
+    """Snapshot location for a source, stable across modifications of that source"""
+    if kwargs.get('file', False):
+        source = os.path.abspath(source)
+    elif kwargs.get('stdin', False):
+        source = "stdin"
+    name = hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]
+    # Weighted and unweighted snapshots of one source live side by side
+    if kwargs.get('weighted', False):
+        name += "-weighted"
+    return os.path.join(SNAPSHOT_DIR, f"{name}.idx")
+
+def write_snapshot(path: str, words: Iterable[str], key: str = "") -> None:
+    """
+    Write sorted, deduplicated words to a snapshot file
+
+    The file is written under a temporary name and renamed into place, so
+    readers never observe a half-written snapshot.
+
+    Args:
+        path: Destination file
+        words: Words in sorted order
+        key: Source key (see source_key) recorded for staleness checks
+    """
+    offsets = array('I', [0])
+    data = bytearray()
+    for word in words:
+        data += word.encode('utf-8')
+        offsets.append(len(data))
+
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+    body = offsets.tobytes()
+    checksum = zlib.crc32(data, zlib.crc32(body))
+    digest = hashlib.sha1(key.encode('utf-8')).digest()
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(offsets) - 1, len(data), checksum, digest)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with atomic_write(path) as f:
+        f.write(header)
+        f.write(body)
+        f.write(data)
+
+def _encode_bound(bound: str) -> bytes:
+    """UTF-8 of a prefix_bound, which may end in a lone surrogate; the byte order still matches"""
+    return bound.encode('utf-8', 'surrogatepass')
+
+class _MappedWords:
+    """Sequence view returning word i of a snapshot as raw UTF-8 bytes"""
+
+    def __init__(self, buffer: mmap.mmap, offsets, data_start: int, count: int):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.data_start = data_start
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> bytes:
+        start = self.data_start
+        return self.buffer[start + self.offsets[i]:start + self.offsets[i + 1]]
+
+class MappedIndex(PrefixIndex):
+    """
+    Sorted word index served straight from a memory-mapped snapshot
+
+    Opening a snapshot validates it and maps it; nothing is parsed or rebuilt,
+    and pages are only read from disk as queries touch them.
+    """
+
+    def __init__(self, path: str, key: Optional[str] = None):
+        """
+        Args:
+            path: Snapshot file written by write_snapshot
+            key: Expected source key; a snapshot built from another source is rejected
+
+        Raises:
+            SnapshotError: If the snapshot is invalid, outdated or stale
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise SnapshotError(f"Snapshot {path} is empty")
+
+        try:
+            self._validate(key)
+        except SnapshotError:
+            self._buffer.close()
+            raise
+
+    def _validate(self, key: Optional[str]) -> None:
+        """Check the header and checksum, then set up the offset and word views"""
+        buffer = self._buffer
+        if len(buffer) < HEADER.size:
+            raise SnapshotError(f"Snapshot {self.path} is truncated")
+
+        magic, version, count, data_size, checksum, digest = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise SnapshotError(f"{self.path} is not an index snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Snapshot {self.path} has format version {version}, expected {FORMAT_VERSION}")
+
+        data_start = HEADER.size + 4 * (count + 1)
+        if len(buffer) != data_start + data_size:
+            raise SnapshotError(f"Snapshot {self.path} is truncated")
+        if key is not None and digest != hashlib.sha1(key.encode('utf-8')).digest():
+            raise SnapshotError(f"Snapshot {self.path} was built from a different source")
+        if zlib.crc32(memoryview(buffer)[HEADER.size:]) != checksum:
+            raise SnapshotError(f"Snapshot {self.path} failed its checksum")
+
+        offsets = memoryview(buffer)[HEADER.size:data_start]
+        if sys.byteorder == 'big':
+            # Offsets are stored little-endian, so big-endian hosts need a converted copy
+            offsets = array('I', offsets)
+            offsets.byteswap()
+        else:
+            offsets = offsets.cast('I')
+
+        self._offsets = offsets
+        self.words = _MappedWords(buffer, offsets, data_start, count)
+
+    def __reduce__(self):
+        # The mapping can't be pickled, so worker processes reopen the file instead
+        return MappedIndex, (self.path,)
+
+    def close(self) -> None:
+        """Release the mapping"""
+        self.words = None
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._buffer.close()
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def locate(self, prefix: str, start: Optional[Tuple[int, int]] = None) -> Optional[Tuple[int, int]]:
+        """
+        Bisect the mapped words for the range starting with prefix
+
+        Args:
+            prefix: Lowercase prefix to search for
+            start: Range returned for a prefix of `prefix`, searched instead of the whole snapshot
+
+        Returns:
+            Half-open index range (lo, hi) of the matches, or None if there are none
+        """
+        key = prefix.encode('utf-8')
+        words = self.words
+        lo, hi = (0, len(words)) if start is None else start
+
+        lo = bisect_left(words, key, lo, hi)
+        high = prefix_bound(prefix)
+        if high is not None:
+            hi = bisect_left(words, _encode_bound(high), lo, hi)
+
+        return (lo, hi) if lo < hi else None
+
+    def iter_children(self, cursor: Tuple[int, int], prefix: str) -> Iterator[Tuple[str, Tuple[int, int]]]:
+        """
+        Split a located range into the sub-ranges of each next character
+
+        Args:
+            cursor: Range returned by locate(prefix)
+            prefix: The prefix the range was located for
+
+        Yields:
+            (character, range of the words starting with prefix + character)
+        """
+        words = self.words
+        depth = len(prefix)
+        lo, hi = cursor
+
+        while lo < hi:
+            word = words[lo].decode('utf-8')
+            if len(word) == depth:
+                # The prefix itself is a word and sorts first
+                lo += 1
+                continue
+            ch = word[depth]
+            high = prefix_bound(prefix + ch)
+            end = bisect_left(words, _encode_bound(high), lo, hi) if high is not None else hi
+            yield ch, (lo, end)
+            lo = end
+
+    def iter_range(self, cursor: Tuple[int, int], prefix: str) -> Iterator[str]:
+        """
+        Lazily decode the words of a located range, in alphabetical order
+
+        Args:
+            cursor: Range returned by locate(prefix)
+            prefix: The prefix the range was located for
+        """
+        words = self.words
+        for i in range(*cursor):
+            yield words[i].decode('utf-8')
+
+def load_or_build(source: str, path: Optional[str] = None, **kwargs) -> MappedIndex:
+    """
+    Open the snapshot for a source, rebuilding it first if it is missing or stale
+
+    Args:
+        source: URL, file path or string of words
+        path: Snapshot file (defaults to one under SNAPSHOT_DIR derived from source)
+        **kwargs: url=True, file=True or stdin=True, as for the other index backends
+
+    Returns:
+        MappedIndex over an up-to-date snapshot
+    """
+    key = source_key(source, **kwargs)
+    if path is None:
+        path = default_snapshot_path(source, **kwargs)
+
+    # Standard input can't be compared with what the snapshot was built from
+    if not kwargs.get('stdin', False):
+        try:
+            return MappedIndex(path, key)
+        except (OSError, SnapshotError):
+            pass
+
+    write_snapshot(path, iter_sorted_words(source, **kwargs), key)
+    return MappedIndex(path, key)
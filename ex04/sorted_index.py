@@ -0,0 +1,198 @@
+import heapq
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from index import PrefixIndex, prefix_bound
+from snapshot import write_snapshot
+from wordlist import iter_sorted_entries
+
+class PackedWords:
+    """
+    Read-only sequence of words packed into a single string
+
+    Word i is buffer[offsets[i]:offsets[i + 1]], so the whole list costs one
+    string plus four bytes per word instead of one str object per word.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self.offsets = array('I', [0])
+        parts: List[str] = []
+        position = 0
+        for word in words:
+            parts.append(word)
+            position += len(word)
+            self.offsets.append(position)
+        self.buffer = ''.join(parts)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]]
+
+class SortedIndex(PrefixIndex):
+    """
+    Sorted word array searched with bisect
+
+    Keeps only the sorted, deduplicated wordlist (packed, see PackedWords), so
+    there are no per-node objects and no recursion. A prefix query is two
+    binary searches followed by a slice of the matching range.
+
+    With weighted=True the words' weights are kept in a parallel array, plus a
+    segment tree whose nodes hold the position of the heaviest word below
+    them, so top-k queries skip every part of a range that can't contribute.
+    """
+
+    def __init__(self, source: str, **kwargs):
+        self._init_sorted(iter_sorted_entries(source, **kwargs), kwargs.get('weighted', False))
+
+    def _init_sorted(self, entries: Iterable[Tuple[str, float]], weighted: bool) -> None:
+        self.weighted = weighted
+        if not self.weighted:
+            self.words = PackedWords(word for word, _ in entries)
+            return
+
+        self.weights = array('d')
+
+        def words():
+            for word, weight in entries:
+                self.weights.append(weight)
+                yield word
+
+        self.words = PackedWords(words())
+        self._build_tree()
+
+    def _heavier(self, i: int, j: int) -> int:
+        """Position of the heavier of two words, the earlier one on ties (-1 means none)"""
+        if i < 0:
+            return j
+        if j < 0:
+            return i
+        wi, wj = self.weights[i], self.weights[j]
+        if wi > wj or (wi == wj and i < j):
+            return i
+        return j
+
+    def _build_tree(self) -> None:
+        """Build the bottom-up segment tree: leaves at n..2n-1, node i covers nodes 2i and 2i+1"""
+        n = len(self.weights)
+        self._tree = array('i', [-1]) * n + array('i', range(n))
+        for i in range(n - 1, 0, -1):
+            self._tree[i] = self._heavier(self._tree[2 * i], self._tree[2 * i + 1])
+
+    def _heaviest(self, lo: int, hi: int) -> int:
+        """Position of the heaviest word in [lo, hi), the first one on ties"""
+        tree = self._tree
+        best = -1
+        lo += len(self.weights)
+        hi += len(self.weights)
+        while lo < hi:
+            if lo & 1:
+                best = self._heavier(best, tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = self._heavier(best, tree[hi])
+            lo >>= 1
+            hi >>= 1
+        return best
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def locate(self, prefix: str, start: Optional[Tuple[int, int]] = None) -> Optional[Tuple[int, int]]:
+        """
+        Bisect for the range of words starting with prefix
+
+        Args:
+            prefix: Lowercase prefix to search for
+            start: Range returned for a prefix of `prefix`, searched instead of the whole array
+
+        Returns:
+            Half-open index range (lo, hi) of the matches, or None if there are none
+        """
+        words = self.words
+        lo, hi = (0, len(words)) if start is None else start
+
+        lo = bisect_left(words, prefix, lo, hi)
+        high = prefix_bound(prefix)
+        if high is not None:
+            hi = bisect_left(words, high, lo, hi)
+
+        return (lo, hi) if lo < hi else None
+
+    def iter_children(self, cursor: Tuple[int, int], prefix: str) -> Iterator[Tuple[str, Tuple[int, int]]]:
+        """
+        Split a located range into the sub-ranges of each next character
+
+        Args:
+            cursor: Range returned by locate(prefix)
+            prefix: The prefix the range was located for
+
+        Yields:
+            (character, range of the words starting with prefix + character)
+        """
+        words = self.words
+        depth = len(prefix)
+        lo, hi = cursor
+        if len(words[lo]) == depth:
+            # The prefix itself is a word and sorts first
+            lo += 1
+
+        while lo < hi:
+            ch = words[lo][depth]
+            # Everything starting with prefix + ch sorts below prefix + the next character
+            high = prefix_bound(prefix + ch)
+            end = bisect_left(words, high, lo, hi) if high is not None else hi
+            yield ch, (lo, end)
+            lo = end
+
+    def iter_range(self, cursor: Tuple[int, int], prefix: str) -> Iterator[str]:
+        """
+        Lazily yield the words of a located range, in alphabetical order
+
+        Args:
+            cursor: Range returned by locate(prefix)
+            prefix: The prefix the range was located for
+        """
+        words = self.words
+        for i in range(*cursor):
+            yield words[i]
+
+    def iter_ranked_entries(self, cursor: Tuple[int, int], prefix: str) -> Iterator[Tuple[str, float]]:
+        """
+        Lazily yield (word, weight) for the words of a located range, heaviest first, ties alphabetically
+
+        A heap holds disjoint sub-ranges keyed by their heaviest word; taking
+        that word splits its range in two, so k words cost O(k log n).
+
+        Args:
+            cursor: Range returned by locate(prefix)
+            prefix: The prefix the range was located for
+        """
+        if not self.weighted:
+            yield from super().iter_ranked_entries(cursor, prefix)
+            return
+
+        weights = self.weights
+        lo, hi = cursor
+        best = self._heaviest(lo, hi)
+        heap = [(-weights[best], best, lo, hi)]
+        while heap:
+            weight, best, lo, hi = heapq.heappop(heap)
+            yield self.words[best], -weight
+            for part_lo, part_hi in ((lo, best), (best + 1, hi)):
+                if part_lo < part_hi:
+                    part_best = self._heaviest(part_lo, part_hi)
+                    heapq.heappush(heap, (-weights[part_best], part_best, part_lo, part_hi))
+
+    def save(self, path: str, key: str = "") -> None:
+        """
+        Save the index as a snapshot that MappedIndex can open without rebuilding
+
+        Args:
+            path: Destination file
+            key: Source key (see snapshot.source_key) used to detect stale snapshots
+        """
+        write_snapshot(path, (self.words[i] for i in range(len(self.words))), key)
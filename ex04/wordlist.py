@@ -0,0 +1,190 @@
+"""
+Wordlist loading shared by the autocomplete index backends
+
+Words are streamed from their source and deduplicated in bounded runs. When a
+source holds more unique words than fit in one run, each run is sorted and
+spilled to a temporary file and the runs are merged lazily, so peak memory
+while loading stays around one run no matter how large the wordlist is.
+"""
+
+import heapq
+import math
+import sys
+import tempfile
+from operator import itemgetter
+from typing import IO, Dict, Iterable, Iterator, List, Tuple
+
+from fetch import fetch
+
+# Unique words kept in memory before a sorted run is spilled to disk
+DEFAULT_RUN_SIZE = 1_000_000
+
+def iter_lines(source: str, **kwargs) -> Iterator[str]:
+    """
+    Yield the raw entries of a wordlist one at a time
+
+    Args:
+        source: URL, file path, or a string of words separated by spaces or newlines
+        **kwargs: url=True to fetch from a URL, file=True to read a local file,
+            stdin=True to read standard input (source is then ignored)
+
+    Yields:
+        Unnormalized lines (or words, for a string source)
+    """
+    url_mode = kwargs.get('url', False)
+    file_mode = kwargs.get('file', False)
+    stdin_mode = kwargs.get('stdin', False)
+
+    if url_mode + file_mode + stdin_mode > 1:
+        raise ValueError("Only one of url, file and stdin can be True at the same time")
+
+    if url_mode:
+        # Fetch wordlist from URL through the download cache (only downloaded again if it changed)
+        try:
+            with open(fetch(source).path, 'r', encoding='utf-8') as f:
+                yield from f
+        except Exception as e:
+            raise Exception(f"Failed to fetch wordlist from URL: {e}")
+
+    elif file_mode:
+        # Read wordlist from local file
+        try:
+            with open(source, 'r', encoding='utf-8') as f:
+                yield from f
+        except Exception as e:
+            raise Exception(f"Failed to read wordlist from file: {e}")
+
+    elif stdin_mode:
+        yield from sys.stdin
+
+    else:
+        # Assume it's a string of words separated by spaces or newlines
+        yield from source.split()
+
+def parse_entry(line: str, weighted: bool) -> Tuple[str, float]:
+    """Split a line into a normalized word and its weight (1 unless a weight column is parsed)"""
+    entry = line.strip().lower()
+    if weighted:
+        parts = entry.rsplit(None, 1)
+        if len(parts) == 2:
+            try:
+                weight = float(parts[1])
+            except ValueError:
+                pass
+            else:
+                # nan and inf would break the weight ordering, so they don't count as weights
+                if math.isfinite(weight):
+                    return parts[0], weight
+    return entry, 1.0
+
+def write_run(run: IO[str], entries: Iterable[Tuple[str, float]]) -> None:
+    """Write (word, weight) pairs to a text file, one tab-separated pair per line"""
+    run.writelines(f"{word}\t{weight!r}\n" for word, weight in entries)
+
+def read_run(run: IO[str]) -> Iterator[Tuple[str, float]]:
+    """Read back the (word, weight) pairs written by write_run"""
+    for line in run:
+        word, _, weight = line[:-1].rpartition('\t')
+        yield word, float(weight)
+
+def merge_runs(runs: Iterable[Iterator[Tuple[str, float]]]) -> Iterator[Tuple[str, float]]:
+    """
+    Lazily merge sorted runs of unique words, summing the weights of words found in several
+
+    Args:
+        runs: Streams of (word, weight) pairs, each in ascending word order without repeats
+
+    Yields:
+        (word, weight) pairs in ascending word order, each word exactly once
+    """
+    # Runs are deduplicated internally, so only neighbours across runs can repeat
+    previous, total = None, 0.0
+    for word, weight in heapq.merge(*runs, key=itemgetter(0)):
+        if word == previous:
+            total += weight
+            continue
+        if previous is not None:
+            yield previous, total
+        previous, total = word, weight
+    if previous is not None:
+        yield previous, total
+
+def _spill(entries: List[Tuple[str, float]]) -> IO[str]:
+    """Write a sorted run to an anonymous temporary file, rewound for reading"""
+    run = tempfile.TemporaryFile('w+', encoding='utf-8')
+    write_run(run, entries)
+    run.seek(0)
+    return run
+
+def iter_sorted_entries(source: str, run_size: int = DEFAULT_RUN_SIZE, **kwargs) -> Iterator[Tuple[str, float]]:
+    """
+    Stream a wordlist as sorted, unique, lowercase words with their weights
+
+    With weighted=True each line may end in a numeric weight column, such as a
+    frequency count ("hello 8051"). Otherwise, and for lines without a valid
+    weight, every occurrence weighs 1. Weights of repeated words are summed.
+
+    Args:
+        source: URL, file path, or a string of words (see iter_lines)
+        run_size: Unique words held in memory before a sorted run is spilled
+        **kwargs: url=True, file=True or stdin=True (see iter_lines), weighted=True
+
+    Yields:
+        (word, weight) pairs in ascending word order, each word exactly once
+    """
+    weighted = kwargs.pop('weighted', False)
+    runs: List[IO[str]] = []
+    seen: Dict[str, float] = {}
+
+    try:
+        for line in iter_lines(source, **kwargs):
+            word, weight = parse_entry(line, weighted)
+            if word:
+                seen[word] = seen.get(word, 0.0) + weight
+                if len(seen) >= run_size:
+                    runs.append(_spill(sorted(seen.items())))
+                    seen.clear()
+
+        if not runs:
+            # Everything fit in a single run, no merge needed
+            yield from sorted(seen.items())
+            return
+
+        if seen:
+            runs.append(_spill(sorted(seen.items())))
+            seen.clear()
+
+        yield from merge_runs(read_run(run) for run in runs)
+    finally:
+        for run in runs:
+            run.close()
+
+def iter_sorted_words(source: str, run_size: int = DEFAULT_RUN_SIZE, **kwargs) -> Iterator[str]:
+    """
+    Stream a wordlist as sorted, unique, lowercase words
+
+    Args:
+        source: URL, file path, or a string of words (see iter_lines)
+        run_size: Unique words held in memory before a sorted run is spilled
+        **kwargs: url=True, file=True or stdin=True (see iter_lines); with
+            weighted=True a trailing weight column is parsed off and dropped
+
+    Yields:
+        Normalized words in ascending order, each exactly once
+    """
+    for word, _ in iter_sorted_entries(source, run_size, **kwargs):
+        yield word
+
+def load_words(source: str, **kwargs) -> List[str]:
+    """
+    Load a wordlist and normalize it for indexing
+
+    Args:
+        source: URL, file path, or a string of words separated by spaces or newlines
+        **kwargs: url=True, file=True or stdin=True, and optionally run_size
+            (see iter_sorted_words)
+
+    Returns:
+        Sorted list of unique lowercase words
+    """
+    return list(iter_sorted_words(source, **kwargs))
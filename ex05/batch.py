@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Solve many maze files at once, in parallel
+
+Mazes are named by files, directories (every .txt file in them) or glob
+patterns and solved across a pool of worker processes with each of the
+chosen algorithms. Nothing is drawn: every maze produces one JSON object
+per line, written as soon as its worker finishes, so the output of a large
+corpus can be piped, appended to a file and compared between runs:
+
+    {"maze": "mazes/m0001.txt", "rows": 41, "cols": 41, "results": {"bfs": {
+     "solvable": true, "steps": 112, "cost": 112, "expanded": 731,
+     "peak_frontier": 9, "time_ms": 0.84}, ...}}
+
+A maze that can't be read, has no single S and T, or fails in any other
+way gets an "error" instead of "results", and the other mazes carry on.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List
+
+from search_maze import MazeSolver, maze_error
+from strategies import STRATEGIES
+
+# Algorithms JunctionGraph.search supports
+GRAPH_ALGORITHMS = ('bfs', 'dfs', 'dijkstra', 'astar')
+
+def find_mazes(patterns: List[str]) -> List[str]:
+    """Expand files, directories and glob patterns into a sorted, duplicate-free list of maze files"""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(glob.glob(os.path.join(pattern, '*.txt')))
+        elif any(ch in pattern for ch in '*?['):
+            paths.extend(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        else:
+            paths.append(pattern)
+    return sorted(set(paths))
+
+def solve_file(path: str, algorithms: List[str], contracted: bool = False) -> Dict[str, Any]:
+    """
+    Solve one maze file with each algorithm
+
+    Args:
+        path: Maze file
+        algorithms: Names of strategies in STRATEGIES
+        contracted: Search the maze's junction graph instead of every cell
+
+    Returns:
+        The maze's JSON record
+    """
+    record: Dict[str, Any] = {'maze': path}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            maze = f.read().splitlines()
+    except (OSError, UnicodeDecodeError) as e:
+        record['error'] = f"Failed to read maze: {e}"
+        return record
+    while maze and not maze[-1]:
+        maze.pop()
+
+    error = maze_error(maze)
+    if error is not None:
+        record['error'] = error
+        return record
+    record['rows'], record['cols'] = len(maze), len(maze[0])
+
+    try:
+        # One solver per maze, so the grid (and junction graph) is built once for all algorithms
+        solver = MazeSolver(maze)
+        solver.find_positions()
+        grid = solver.grid
+        results = {}
+        for algorithm in algorithms:
+            result = solver.search(algorithm, contracted)
+            entry: Dict[str, Any] = {'solvable': result.found}
+            if result.path:
+                entry['steps'] = len(result.path) - 1
+                entry['cost'] = sum(grid.costs[grid.index(row, col)] for row, col in result.path[1:])
+            entry['expanded'] = result.expanded
+            entry['peak_frontier'] = result.peak_frontier
+            entry['time_ms'] = round(result.elapsed * 1000, 3)
+            results[algorithm] = entry
+    except ValueError as e:
+        # UnicodeError is a ValueError too
+        record['error'] = f"Failed to solve maze: {e}"
+        return record
+    record['results'] = results
+    return record
+
+def solve_all(paths: List[str], algorithms: List[str], workers: int, contracted: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Solve maze files across worker processes, yielding records as they finish
+
+    Args:
+        paths: Maze files
+        algorithms: Names of strategies in STRATEGIES
+        workers: Worker processes (0 solves in this process, in order)
+        contracted: Search the junction graphs instead of every cell
+    """
+    if workers <= 0:
+        for path in paths:
+            try:
+                yield solve_file(path, algorithms, contracted)
+            except Exception as e:
+                yield {'maze': path, 'error': f"Failed to solve maze: {e!r}"}
+        return
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending: Dict[Future, str] = {}
+        for path in paths:
+            # Only a few mazes per worker in flight, so a huge corpus isn't all queued up front
+            if len(pending) >= 4 * workers:
+                yield from _finished(pending)
+            pending[pool.submit(solve_file, path, algorithms, contracted)] = path
+        while pending:
+            yield from _finished(pending)
+
+def _finished(pending: Dict[Future, str]) -> Iterator[Dict[str, Any]]:
+    """Wait for at least one maze to finish and yield the records of every finished one"""
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        path = pending.pop(future)
+        try:
+            yield future.result()
+        except Exception as e:
+            # A crash on one maze (even of its worker) costs that maze's record, not the run
+            yield {'maze': path, 'error': f"Failed to solve maze: {e!r}"}
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve maze files in parallel and print JSON results")
+    parser.add_argument("mazes", nargs="+", help="maze files, directories of .txt mazes, or glob patterns")
+    parser.add_argument("--algorithms", nargs="+", choices=list(STRATEGIES), default=['bfs'])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (0 solves in this process; defaults to the CPU count)")
+    parser.add_argument("--junctions", action="store_true",
+                        help="search the corridor-contracted junction graph (not with bibfs)")
+    parser.add_argument("--output", help="append results to this file instead of printing them")
+    args = parser.parse_args()
+
+    if args.junctions and not set(args.algorithms) <= set(GRAPH_ALGORITHMS):
+        parser.error(f"--junctions supports only: {', '.join(GRAPH_ALGORITHMS)}")
+    paths = find_mazes(args.mazes)
+    if not paths:
+        parser.error("no maze files found")
+
+    start = time.perf_counter()
+    solved = failed = 0
+    output = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for record in solve_all(paths, args.algorithms, args.workers, args.junctions):
+            if 'error' in record:
+                failed += 1
+            elif all(entry['solvable'] for entry in record['results'].values()):
+                solved += 1
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths)} mazes: {solved} solvable, {len(paths) - solved - failed} unsolvable, "
+          f"{failed} failed, in {elapsed:.2f} s", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
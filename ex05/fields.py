@@ -0,0 +1,251 @@
+"""
+Cached BFS distance fields for answering many queries on one maze
+
+A distance field is one full breadth-first search from a source cell: the
+number of steps to every reachable cell and the cell each one is reached
+from. With it, the shortest path from the source to any target is just the
+parent chain walked back, so asking for one target or a thousand costs no
+further search.
+
+Fields are cached by the maze layout's content hash and the source cell, so
+mazes read from different files, or solved by different MazeSolvers, share
+them as long as their walls are the same. The cache evicts least recently
+used fields, and can keep fields on disk between runs.
+
+A field file is a 28-byte header followed by the parent and distance arrays
+as little-endian int32:
+
+    magic, format version, grid stride, grid size, source cell, CRC-32 of
+    both arrays
+
+A file whose arrays don't match their checksum is ignored, since a damaged
+parent array could send path reconstruction round a cycle forever.
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from grid import MazeGrid, WALL
+
+# Field files are written with the autocomplete exercise's atomic file writer
+_EX04 = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ex04')
+if _EX04 not in sys.path:
+    sys.path.append(_EX04)
+from atomic import atomic_write
+
+MAGIC = b'MAZEFLD\x00'
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<8sHxxIIII')
+
+UNREACHED = -1
+
+def layout_digest(grid: MazeGrid) -> str:
+    """SHA-1 of a grid's walls and shape; markers such as S, T or a drawn path don't change it"""
+    digest = hashlib.sha1(struct.pack('<II', grid.rows, grid.cols))
+    digest.update(grid.moves)
+    return digest.hexdigest()
+
+class DistanceField:
+    """Steps from one source to every cell of a grid, and the parent links of a BFS tree"""
+
+    def __init__(self, source: int, parent: array, distance: array):
+        """
+        Args:
+            source: Flat index of the source cell
+            parent: Cell each reached cell was reached from (-1 for the source and unreached cells)
+            distance: Steps from the source (-1 for unreached cells)
+        """
+        self.source = source
+        self.parent = parent
+        self.distance = distance
+
+    @classmethod
+    def compute(cls, grid: MazeGrid, source: int) -> 'DistanceField':
+        """Run one breadth-first search from source over the whole grid"""
+        offsets = grid.offsets
+        moves = grid.moves
+        size = len(moves)
+        parent = array('i', [UNREACHED]) * size
+        distance = array('i', [UNREACHED]) * size
+
+        distance[source] = 0
+        layer = [source]
+        steps = 0
+        while layer:
+            steps += 1
+            next_layer = []
+            for current in layer:
+                for step in offsets[moves[current]]:
+                    neighbor = current + step
+                    if distance[neighbor] == UNREACHED:
+                        distance[neighbor] = steps
+                        parent[neighbor] = current
+                        next_layer.append(neighbor)
+            layer = next_layer
+        return cls(source, parent, distance)
+
+    @property
+    def nbytes(self) -> int:
+        return (len(self.parent) + len(self.distance)) * self.parent.itemsize
+
+    def distance_to(self, target: int) -> int:
+        """Steps from the source to target, or -1 if it can't be reached"""
+        return self.distance[target]
+
+    def path_to(self, target: int) -> Optional[List[int]]:
+        """Cells of a shortest path from the source to target, or None"""
+        if self.distance[target] == UNREACHED:
+            return None
+        parent = self.parent
+        path = []
+        while target >= 0:
+            path.append(target)
+            target = parent[target]
+        return path[::-1]
+
+    def save(self, path: str, stride: int) -> None:
+        """Write the field to a file, atomically"""
+        parent, distance = self.parent, self.distance
+        if sys.byteorder == 'big':
+            parent, distance = array('i', parent), array('i', distance)
+            parent.byteswap()
+            distance.byteswap()
+
+        checksum = zlib.crc32(distance, zlib.crc32(parent))
+
+        with atomic_write(path) as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, stride, len(parent), self.source, checksum))
+            parent.tofile(f)
+            distance.tofile(f)
+
+    @classmethod
+    def load(cls, path: str, grid: MazeGrid, source: int) -> Optional['DistanceField']:
+        """Read a field saved for this grid and source; None if it is missing, damaged or for another grid"""
+        size = len(grid.moves)
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    return None
+                magic, version, stride, count, saved_source, checksum = HEADER.unpack(header)
+                if (magic, version, stride, count, saved_source) != (MAGIC, FORMAT_VERSION, grid.stride, size, source):
+                    return None
+                parent, distance = array('i'), array('i')
+                parent.fromfile(f, size)
+                distance.fromfile(f, size)
+        except (OSError, EOFError, ValueError):
+            # Missing, or cut short by a crash or a full disk
+            return None
+        if zlib.crc32(distance, zlib.crc32(parent)) != checksum:
+            return None
+
+        if sys.byteorder == 'big':
+            parent.byteswap()
+            distance.byteswap()
+        return cls(source, parent, distance)
+
+class FieldCache:
+    """
+    Bounded LRU cache of distance fields, optionally backed by a directory
+
+    Entries are keyed by (layout digest, source cell). Fields evicted from
+    memory stay on disk when a directory is given, and are read back instead
+    of searched again, also by later runs.
+    """
+
+    def __init__(self, max_entries: int = 16, max_bytes: int = 256 * 1024 * 1024,
+                 directory: Optional[str] = None):
+        """
+        Args:
+            max_entries: Maximum number of fields held in memory
+            max_bytes: Maximum size of the fields held in memory, in bytes
+            directory: Where to persist fields between runs (None keeps them in memory only)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+
+        self._entries: 'OrderedDict[Tuple[str, int], DistanceField]' = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.loads = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _file(self, digest: str, source: int) -> str:
+        return os.path.join(self.directory, f"{digest}-{source}.field")
+
+    def field(self, grid: MazeGrid, source: int, digest: Optional[str] = None) -> DistanceField:
+        """
+        The distance field of a grid from source, computed only if no cached one exists
+
+        Args:
+            grid: The maze
+            source: Flat index of an open cell
+            digest: layout_digest(grid), if the caller already has it
+
+        Returns:
+            The DistanceField
+        """
+        if grid.cells[source] == WALL:
+            raise ValueError("The source of a distance field must be an open cell")
+        key = (digest or layout_digest(grid), source)
+        field = self._entries.get(key)
+        if field is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return field
+
+        field = DistanceField.load(self._file(*key), grid, source) if self.directory else None
+        if field is not None:
+            self.loads += 1
+        else:
+            self.misses += 1
+            field = DistanceField.compute(grid, source)
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+                field.save(self._file(*key), grid.stride)
+
+        if field.nbytes <= self.max_bytes and self.max_entries > 0:
+            self._entries[key] = field
+            self._bytes += field.nbytes
+            self._evict()
+        return field
+
+    def _evict(self) -> None:
+        """Drop least recently used fields until both budgets are met"""
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, field = self._entries.popitem(last=False)
+            self._bytes -= field.nbytes
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Forget the fields held in memory (files on disk are kept)"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns:
+            Hit, disk load, miss and eviction counters together with the current cache occupancy
+        """
+        lookups = self.hits + self.loads + self.misses
+        return {
+            'hits': self.hits,
+            'loads': self.loads,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.loads) / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+        }
+
+# Shared by every MazeSolver that isn't given its own cache
+FIELDS = FieldCache()
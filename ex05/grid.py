@@ -0,0 +1,100 @@
+"""
+Compact grid representation for maze search
+
+The maze is held as one contiguous bytearray, one byte per cell, with a
+border of walls around it so that the four neighbours of any cell inside
+are always at index - stride, index + stride, index - 1 and index + 1 and
+no bounds checks are needed. Cells are addressed by that flat index.
+
+For every cell the directions that lead to an open cell are stored as a
+4-bit mask, computed for the whole grid at once with big-integer shifts.
+Searches look up the tuple of offsets for a mask in a table built once per
+grid, so expanding a cell allocates no lists or coordinate tuples.
+"""
+
+from typing import List, Tuple
+
+WALL = ord('#')
+PATH = ord('.')
+START = ord('S')
+TARGET = ord('T')
+SOLUTION = ord('*')
+
+# Byte value 1 for cells that can be walked on, 0 for walls
+_PASSABLE = bytes(0 if value == WALL else 1 for value in range(256))
+# Cost of entering a cell: digits '1'..'9' weigh their value, other open cells 1
+_COSTS = bytes(0 if value == WALL else value - 48 if 49 <= value <= 57 else 1 for value in range(256))
+
+class MazeGrid:
+    """
+    Maze cells in a padded, flat bytearray
+
+    Cell (row, col) of the maze is at index (row + 1) * stride + col + 1,
+    where stride is the padded width. The neighbour bits of moves[i] are, in
+    search order: 1 up, 2 down, 4 left, 8 right. costs[i] is the cost of
+    entering cell i.
+    """
+
+    def __init__(self, maze: List[str]):
+        """
+        Args:
+            maze: Rows of the maze, all the same length
+        """
+        self.rows = len(maze)
+        self.cols = len(maze[0]) if maze else 0
+        self.stride = self.cols + 2
+
+        cells = bytearray(b'#' * self.stride)
+        for row in maze:
+            if len(row) != self.cols:
+                raise ValueError("Maze rows have inconsistent lengths")
+            # Any character but '#' is open floor; one outside ASCII is kept as a '?' cell
+            cells += b'#' + row.encode('ascii', 'replace') + b'#'
+        cells += b'#' * self.stride
+        self.cells = cells
+
+        # Offsets for each direction mask, in the same order as the mask bits
+        steps = (-self.stride, self.stride, -1, 1)
+        self.offsets: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(step for bit, step in enumerate(steps) if mask >> bit & 1) for mask in range(16)
+        )
+        self.moves = self._compute_moves()
+        self.costs = cells.translate(_COSTS)
+
+    def _compute_moves(self) -> bytearray:
+        """Neighbour masks of every cell, computed with whole-grid shifts instead of a per-cell loop"""
+        size = len(self.cells)
+        # Byte i of this integer is 1 if cell i is open
+        passable = int.from_bytes(self.cells.translate(_PASSABLE), 'little')
+        row_shift = 8 * self.stride
+
+        up = passable << row_shift      # byte i = cell i - stride
+        down = passable >> row_shift    # byte i = cell i + stride
+        left = passable << 8            # byte i = cell i - 1
+        right = passable >> 8           # byte i = cell i + 1
+        masks = up | down << 1 | left << 2 | right << 3
+        # Walls get no moves; the border keeps shifted bits from wrapping into another row
+        masks &= passable * 0x0F
+        return bytearray(masks.to_bytes(size, 'little'))
+
+    def index(self, row: int, col: int) -> int:
+        """Flat index of a maze cell"""
+        return (row + 1) * self.stride + col + 1
+
+    def position(self, index: int) -> Tuple[int, int]:
+        """(row, col) of a flat index"""
+        row, col = divmod(index, self.stride)
+        return row - 1, col - 1
+
+    def find(self, value: int) -> int:
+        """Flat index of the first cell holding value, or -1"""
+        return self.cells.find(value)
+
+    def neighbors(self, index: int) -> Tuple[int, ...]:
+        """Flat indexes of the open cells next to a cell, up, down, left, right"""
+        return tuple(index + step for step in self.offsets[self.moves[index]])
+
+    def row(self, row: int) -> str:
+        """One row of the maze as text"""
+        start = (row + 1) * self.stride + 1
+        return self.cells[start:start + self.cols].decode('ascii')
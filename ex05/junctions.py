@@ -0,0 +1,247 @@
+"""
+Corridor-contracted maze graph
+
+Most open cells of a generated maze are corridor cells with exactly two
+open neighbours, and searching them one by one only walks along the
+corridor. A JunctionGraph keeps just the cells where something can happen
+(junctions with three or four ways out, dead ends, and any cells asked to be
+kept, such as S and T) and joins them by the corridors between them. Each
+edge records the corridor's length in steps, its cost (the sum of the cell
+weights entered along it) and the first step out of the cell, which is
+enough to walk the corridor again and expand a graph path back into cells.
+
+The graph is built once per maze and answers any number of queries. A start
+or target in the middle of a corridor is spliced in for the one query only.
+"""
+
+import collections
+import heapq
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from grid import MazeGrid
+
+# Edge: (cell at the other end, steps, cost, step out of this cell into the corridor)
+Edge = Tuple[int, int, int, int]
+
+# 1 for neighbour masks with one, three or four ways out: dead ends and junctions
+_NODE_MASKS = bytes(bin(mask).count('1') in (1, 3, 4) for mask in range(16)) + bytes(240)
+
+# Which edge length each algorithm minimizes (1 = steps, 2 = cost); dfs takes any path
+_WEIGHTS = {'bfs': 1, 'dijkstra': 2, 'astar': 2}
+
+class JunctionGraph:
+    """Weighted graph of a maze's junctions and dead ends, joined by its corridors"""
+
+    def __init__(self, grid: MazeGrid, keep: Iterable[int] = ()):
+        """
+        Args:
+            grid: The maze
+            keep: Flat indexes of cells to make nodes even if they are corridor cells
+        """
+        self.grid = grid
+        # 1 for every cell that is a node of the graph
+        self.is_node = grid.moves.translate(_NODE_MASKS)
+        for cell in keep:
+            self.is_node[cell] = 1
+
+        self.edges: Dict[int, List[Edge]] = {}
+        offsets = grid.offsets
+        moves = grid.moves
+        for match in re.finditer(b'\x01', self.is_node):
+            node = match.start()
+            edges = []
+            for step in offsets[moves[node]]:
+                end, length, cost, _ = self._walk(node, step)
+                if end != node:  # A corridor looping back to where it started never helps
+                    edges.append((end, length, cost, step))
+            self.edges[node] = edges
+
+    @property
+    def node_count(self) -> int:
+        return len(self.edges)
+
+    @property
+    def edge_count(self) -> int:
+        return sum(len(edges) for edges in self.edges.values())
+
+    def _walk(self, cell: int, step: int, stops: Tuple[int, ...] = ()) -> Tuple[int, int, int, int]:
+        """
+        Follow a corridor from cell, leaving it by step, to the next node or stop cell
+
+        Returns:
+            (cell reached, steps, cost of the cells entered, cell just before the one reached)
+        """
+        offsets = self.grid.offsets
+        moves = self.grid.moves
+        costs = self.grid.costs
+        is_node = self.is_node
+
+        previous, current = cell, cell + step
+        length, cost = 1, costs[current]
+        while not is_node[current] and current not in stops and current != cell:
+            for step in offsets[moves[current]]:
+                if current + step != previous:
+                    break
+            previous, current = current, current + step
+            length += 1
+            cost += costs[current]
+        return current, length, cost, previous
+
+    def _splice(self, start: int, target: int) -> Dict[int, List[Edge]]:
+        """
+        Adjacency overrides that join a start and target lying inside corridors to the graph
+
+        The corridor edges running through such a cell are replaced by edges
+        ending at it, so paths never pass through the start or target.
+        """
+        overlay: Dict[int, List[Edge]] = {}
+        costs = self.grid.costs
+        stops = (start, target)
+
+        def cut(node: int, before: int) -> List[Edge]:
+            # The node's edges, less the corridor it leaves towards before
+            if node not in overlay:
+                overlay[node] = list(self.edges.get(node, ()))
+            edges = overlay[node]
+            edges[:] = [edge for edge in edges if edge[3] != before - node]
+            return edges
+
+        if not self.is_node[start]:
+            overlay[start] = []
+            for step in self.grid.offsets[self.grid.moves[start]]:
+                end, length, cost, before = self._walk(start, step, stops)
+                if end != start:
+                    overlay[start].append((end, length, cost, step))
+                    if end != target:
+                        cut(end, before)
+
+        if not self.is_node[target]:
+            for step in self.grid.offsets[self.grid.moves[target]]:
+                end, length, cost, before = self._walk(target, step, stops)
+                if end == target or (end == start and not self.is_node[start]):
+                    continue  # A loop, or the corridor the spliced start already reaches target by
+                # Walking the same corridor the other way enters target instead of end
+                cut(end, before).append((target, length, cost - costs[end] + costs[target], before - end))
+        return overlay
+
+    def search(self, start: int, target: int, algorithm: str) -> Tuple[Optional[List[int]], int, int]:
+        """
+        Find a path between two open cells on the graph
+
+        bfs finds the fewest steps, dijkstra and astar the lowest cost, and
+        dfs any path, as their cell-by-cell counterparts in strategies.py do.
+
+        Args:
+            start: Flat index of the first cell
+            target: Flat index of the last cell
+            algorithm: 'bfs', 'dfs', 'dijkstra' or 'astar'
+
+        Returns:
+            (cells of the path or None, nodes expanded, peak frontier size)
+        """
+        if algorithm != 'dfs' and algorithm not in _WEIGHTS:
+            raise ValueError(f"Algorithm must be one of: dfs, {', '.join(_WEIGHTS)}")
+        if start == target:
+            return [start], 1, 1
+
+        overlay = self._splice(start, target)
+        if algorithm == 'dfs':
+            parent, expanded, peak = self._depth_first(start, target, overlay)
+        else:
+            parent, expanded, peak = self._best_first(start, target, overlay, algorithm)
+        if target not in parent:
+            return None, expanded, peak
+        return self._expand(start, target, parent), expanded, peak
+
+    def _depth_first(self, start: int, target: int,
+                     overlay: Dict[int, List[Edge]]) -> Tuple[Dict[int, Tuple[int, int]], int, int]:
+        edges = self.edges
+        parent: Dict[int, Tuple[int, int]] = {start: (-1, 0)}
+        frontier = [start]
+        expanded = 0
+        peak = 1
+
+        while frontier:
+            if len(frontier) > peak:
+                peak = len(frontier)
+            current = frontier.pop()
+            expanded += 1
+            if current == target:
+                break
+            for neighbor, _, _, step in overlay[current] if current in overlay else edges[current]:
+                if neighbor not in parent:
+                    parent[neighbor] = (current, step)
+                    frontier.append(neighbor)
+        return parent, expanded, peak
+
+    def _best_first(self, start: int, target: int, overlay: Dict[int, List[Edge]],
+                    algorithm: str) -> Tuple[Dict[int, Tuple[int, int]], int, int]:
+        edges = self.edges
+        weight = _WEIGHTS[algorithm]
+        stride = self.grid.stride
+        target_row, target_col = divmod(target, stride)
+
+        def manhattan(index: int) -> int:
+            row, col = divmod(index, stride)
+            return abs(row - target_row) + abs(col - target_col)
+
+        # An edge is at least as long as the Manhattan distance between its ends
+        heuristic = manhattan if algorithm == 'astar' else None
+        parent: Dict[int, Tuple[int, int]] = {start: (-1, 0)}
+        best = {start: 0}
+        closed = set()
+        heap = [(heuristic(start) if heuristic else 0, 0, start)]
+        expanded = 0
+        peak = 1
+
+        while heap:
+            if len(heap) > peak:
+                peak = len(heap)
+            _, cost, current = heapq.heappop(heap)
+            if current in closed:
+                continue
+            closed.add(current)
+            expanded += 1
+            if current == target:
+                break
+
+            cost = -cost
+            for edge in overlay[current] if current in overlay else edges[current]:
+                neighbor = edge[0]
+                if neighbor in closed:
+                    continue
+                new_cost = cost + edge[weight]
+                if new_cost < best.get(neighbor, new_cost + 1):
+                    best[neighbor] = new_cost
+                    parent[neighbor] = (current, edge[3])
+                    estimate = new_cost + heuristic(neighbor) if heuristic else new_cost
+                    heapq.heappush(heap, (estimate, -new_cost, neighbor))
+        else:
+            # Drop the parent links of cells reached but never settled, target among them
+            if target not in closed:
+                parent.pop(target, None)
+        return parent, expanded, peak
+
+    def _expand(self, start: int, target: int, parent: Dict[int, Tuple[int, int]]) -> List[int]:
+        """Walk the corridors of a graph path again to list every cell on it"""
+        hops = collections.deque()
+        node = target
+        while node != start:
+            previous, step = parent[node]
+            hops.appendleft((previous, step, node))
+            node = previous
+
+        offsets = self.grid.offsets
+        moves = self.grid.moves
+        path = [start]
+        for node, step, end in hops:
+            previous, current = node, node + step
+            path.append(current)
+            while current != end:
+                for step in offsets[moves[current]]:
+                    if current + step != previous:
+                        break
+                previous, current = current, current + step
+                path.append(current)
+        return path
@@ -1,12 +1,15 @@
 import sys
-import collections
-import subprocess
-import tempfile
 import os
-from typing import List, Tuple, Optional
+import time
+from typing import Dict, Iterable, List, Tuple, Optional
+
+from fields import FIELDS, DistanceField, FieldCache, layout_digest
+from grid import MazeGrid, PATH, SOLUTION, START, TARGET
+from junctions import JunctionGraph
+from strategies import STRATEGIES, Search, SearchResult
 
 class MazeSolver:
-    """Maze solver using BFS or DFS algorithms"""
+    """Maze solver using BFS, DFS, bidirectional BFS, Dijkstra or A* (see strategies.py)"""
     
     # ANSI color codes
     RED = '\033[91m'
@@ -22,145 +25,184 @@ class MazeSolver:
     TARGET = 'T'
     SOLUTION = '*'
     
-    def __init__(self, maze: List[str]):
-        self.maze = [list(row) for row in maze]
-        self.rows = len(maze)
-        self.cols = len(maze[0]) if maze else 0
+    def __init__(self, maze: List[str], fields: Optional[FieldCache] = None):
+        """
+        Args:
+            maze: Rows of the maze
+            fields: Cache of distance fields for shortest_path queries (defaults to one shared by all solvers)
+        """
+        # Cells live in a flat bytearray; searches work on flat indexes (see grid.py)
+        self.grid = MazeGrid(maze)
+        self.fields = fields if fields is not None else FIELDS
+        self.rows = self.grid.rows
+        self.cols = self.grid.cols
         self.start_pos = None
         self.target_pos = None
+        self.start_index = -1
+        self.target_index = -1
+        self._junctions: Optional[JunctionGraph] = None
+        self._digest: Optional[str] = None
         
     def find_positions(self) -> None:
         """Find the start and target positions in the maze"""
-        for i in range(self.rows):
-            for j in range(self.cols):
-                if self.maze[i][j] == self.START:
-                    self.start_pos = (i, j)
-                elif self.maze[i][j] == self.TARGET:
-                    self.target_pos = (i, j)
+        self.start_index = self.grid.find(START)
+        self.target_index = self.grid.find(TARGET)
         
-        if self.start_pos is None:
+        if self.start_index < 0:
             raise ValueError("Start position 'S' not found in maze")
-        if self.target_pos is None:
+        if self.target_index < 0:
             raise ValueError("Target position 'T' not found in maze")
+        
+        self.start_pos = self.grid.position(self.start_index)
+        self.target_pos = self.grid.position(self.target_index)
     
     def get_neighbors(self, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
-        row, col = pos
-        neighbors = []
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # UP, DOWN, LEFT, RIGHT
-        
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            
-            # Check boundaries
-            if 0 <= new_row < self.rows and 0 <= new_col < self.cols:
-                # Check if it's not a wall and not the start position
-                cell = self.maze[new_row][new_col]
-                if cell != self.WALL and (new_row, new_col) != self.start_pos:
-                    neighbors.append((new_row, new_col))
-        
-        return neighbors
+        """Open cells next to pos (never the start), UP, DOWN, LEFT, RIGHT"""
+        grid = self.grid
+        return [grid.position(index) for index in grid.neighbors(grid.index(*pos))
+                if index != self.start_index]
     
-    def bfs(self) -> Optional[List[Tuple[int, int]]]:
-        queue = collections.deque()
-        visited = set()
-        parent = {}  # To reconstruct the path
-        
-        queue.append(self.start_pos)
-        visited.add(self.start_pos)
-        parent[self.start_pos] = None
+    def junctions(self) -> JunctionGraph:
+        """The maze's corridor-contracted graph, built on first use and kept for later searches"""
+        if self._junctions is None:
+            keep = [index for index in (self.start_index, self.target_index) if index >= 0]
+            self._junctions = JunctionGraph(self.grid, keep)
+        return self._junctions
+    
+    def search(self, algorithm: str, contracted: bool = False) -> SearchResult:
+        """
+        Search for a path from S to T
         
-        while queue:
-            current = queue.popleft()
+        Args:
+            algorithm: Name of a strategy in STRATEGIES
+            contracted: Search the junction graph instead of every cell (bfs, dfs, dijkstra, astar)
             
-            if current == self.target_pos:
-                # Reconstruct path
-                path = []
-                while current is not None:
-                    path.append(current)
-                    current = parent[current]
-                return path[::-1]  # Reverse to get start->target
+        Returns:
+            SearchResult with the cells of the path from start to target (None if
+            there is none), the nodes expanded, the peak frontier size and the time
+        """
+        if contracted:
+            graph = self.junctions()
+            start = time.perf_counter()
+            path, expanded, peak_frontier = graph.search(self.start_index, self.target_index, algorithm)
+            elapsed = time.perf_counter() - start
+        else:
+            strategy = STRATEGIES.get(algorithm)
+            if strategy is None:
+                raise ValueError(f"Algorithm must be one of: {', '.join(STRATEGIES)}")
             
-            for neighbor in self.get_neighbors(current):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    parent[neighbor] = current
-                    queue.append(neighbor)
-        
-        return None
+            search = Search(len(self.grid.cells))
+            start = time.perf_counter()
+            path = strategy(self.grid, self.start_index, self.target_index, search)
+            elapsed = time.perf_counter() - start
+            expanded, peak_frontier = search.expanded, search.peak_frontier
+        if path is not None:
+            path = [self.grid.position(index) for index in path]
+        return SearchResult(algorithm, path, expanded, peak_frontier, elapsed)
     
-    def dfs(self) -> Optional[List[Tuple[int, int]]]:
-        stack = []
-        visited = set()
-        parent = {}  # To reconstruct the path
+    def distance_field(self, source: Optional[Tuple[int, int]] = None) -> DistanceField:
+        """
+        Steps from source (S by default) to every cell, from the field cache when possible
         
-        stack.append(self.start_pos)
-        visited.add(self.start_pos)
-        parent[self.start_pos] = None
-        
-        while stack:
-            current = stack.pop()
+        Args:
+            source: (row, col) of an open cell
             
-            if current == self.target_pos:
-                # Reconstruct path
-                path = []
-                while current is not None:
-                    path.append(current)
-                    current = parent[current]
-                return path[::-1]  # Reverse to get start->target
+        Returns:
+            The DistanceField, indexed by flat cell index
+        """
+        if source is None:
+            if self.start_index < 0:
+                self.find_positions()
+            index = self.start_index
+        else:
+            index = self.grid.index(*source)
+        if self._digest is None:
+            self._digest = layout_digest(self.grid)
+        return self.fields.field(self.grid, index, self._digest)
+    
+    def shortest_path(self, target: Optional[Tuple[int, int]] = None,
+                      source: Optional[Tuple[int, int]] = None) -> Optional[List[Tuple[int, int]]]:
+        """
+        Shortest path in steps, read off the cached distance field of source
+        
+        Args:
+            target: (row, col) to reach (T by default)
+            source: (row, col) to start from (S by default)
             
-            for neighbor in self.get_neighbors(current):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    parent[neighbor] = current
-                    stack.append(neighbor)
+        Returns:
+            The cells of the path from source to target, or None if there is none
+        """
+        if target is None and self.target_index < 0:
+            self.find_positions()
+        field = self.distance_field(source)
+        path = field.path_to(self.target_index if target is None else self.grid.index(*target))
+        return None if path is None else [self.grid.position(index) for index in path]
+    
+    def shortest_paths(self, targets: Iterable[Tuple[int, int]],
+                       source: Optional[Tuple[int, int]] = None) -> Dict[Tuple[int, int], Optional[List[Tuple[int, int]]]]:
+        """
+        Shortest paths from one source to many targets, with a single search at most
         
-        return None
+        Returns:
+            The path (or None) to each target, by target
+        """
+        field = self.distance_field(source)
+        paths = {}
+        for target in targets:
+            path = field.path_to(self.grid.index(*target))
+            paths[target] = None if path is None else [self.grid.position(index) for index in path]
+        return paths
     
-    def solve(self, algorithm: str) -> bool:
-        self.find_positions()
+    def bfs(self) -> Optional[List[Tuple[int, int]]]:
+        return self.search('bfs').path
+    
+    def dfs(self) -> Optional[List[Tuple[int, int]]]:
+        return self.search('dfs').path
+    
+    def solve(self, algorithm: str, contracted: bool = False) -> SearchResult:
+        """
+        Search once and mark the path found in the maze
         
-        if algorithm == 'bfs':
-            path = self.bfs()
-        elif algorithm == 'dfs':
-            path = self.dfs()
-        else:
-            raise ValueError("Algorithm must be 'bfs' or 'dfs'")
+        Returns:
+            The SearchResult, which is truthy when a path was found
+        """
+        self.find_positions()
         
-        if path:
+        result = self.search(algorithm, contracted)
+        if result.path:
             # Mark solution path (excluding start and target)
-            for pos in path[1:-1]:  # Skip start and target
-                row, col = pos
+            cells = self.grid.cells
+            for row, col in result.path[1:-1]:  # Skip start and target
+                index = self.grid.index(row, col)
                 # Only replace path characters ('.') with solution marker
-                if self.maze[row][col] == self.PATH:
-                    self.maze[row][col] = self.SOLUTION
-            return True
-        return False
+                if cells[index] == PATH:
+                    cells[index] = SOLUTION
+        return result
     
     def display(self) -> None:
         """Display the maze with ANSI colors"""
+        colors = {
+            self.START: f"{self.YELLOW}{self.START}{self.RESET}",
+            self.TARGET: f"{self.GREEN}{self.TARGET}{self.RESET}",
+            self.SOLUTION: f"{self.RED}{self.SOLUTION}{self.RESET}",
+            self.WALL: f"{self.BLUE}{self.WALL}{self.RESET}",
+        }
         for i in range(self.rows):
-            for j in range(self.cols):
-                cell = self.maze[i][j]
-                if (i, j) == self.start_pos:
-                    print(f"{self.YELLOW}{cell}{self.RESET}", end='')
-                elif (i, j) == self.target_pos:
-                    print(f"{self.GREEN}{cell}{self.RESET}", end='')
-                elif cell == self.SOLUTION:
-                    print(f"{self.RED}{cell}{self.RESET}", end='')
-                elif cell == self.WALL:
-                    print(f"{self.BLUE}{cell}{self.RESET}", end='')
-                else:
-                    print(cell, end='')
-            print()  # New line after each row
+            # One print per row instead of one per cell
+            print(''.join([colors.get(cell, cell) for cell in self.grid.row(i)]))
     
-    def display_stats(self, path: Optional[List[Tuple[int, int]]]) -> None:
-        """Display statistics about the solution"""
+    def display_stats(self, path: Optional[List[Tuple[int, int]]], result: Optional[SearchResult] = None) -> None:
+        """Display statistics about the solution, and about the search if its result is given"""
         if path:
             print(f"\n{self.GREEN}✓ Path found!{self.RESET}")
             print(f"Path length: {len(path)} steps")
             print(f"Steps from start to target: {len(path) - 1}")
         else:
             print(f"\n{self.RED}✗ No path found!{self.RESET}")
+        if result is not None:
+            print(f"Nodes expanded: {result.expanded}")
+            print(f"Peak frontier: {result.peak_frontier}")
+            print(f"Search time: {result.elapsed * 1000:.2f} ms")
 
 def read_maze(filename: str) -> List[str]:
     try:
@@ -174,53 +216,47 @@ def read_maze(filename: str) -> List[str]:
         print(f"Error reading file: {e}")
         sys.exit(1)
 
-def validate_maze(maze: List[str]) -> bool:
+def maze_error(maze: List[str]) -> Optional[str]:
+    """Why a maze can't be solved as given, or None if it is well formed"""
     if not maze:
-        print("Error: Maze is empty.")
-        return False
+        return "Maze is empty."
     
     # Check if all rows have same length
     row_lengths = [len(row) for row in maze]
     if len(set(row_lengths)) != 1:
-        print("Error: Maze rows have inconsistent lengths.")
-        return False
+        return "Maze rows have inconsistent lengths."
     
     # Check for start and target
     start_count = sum(row.count('S') for row in maze)
     target_count = sum(row.count('T') for row in maze)
     
     if start_count != 1:
-        print("Error: Maze must contain exactly one start position 'S'.")
-        return False
+        return "Maze must contain exactly one start position 'S'."
     
     if target_count != 1:
-        print("Error: Maze must contain exactly one target position 'T'.")
-        return False
+        return "Maze must contain exactly one target position 'T'."
     
+    return None
+
+def validate_maze(maze: List[str]) -> bool:
+    error = maze_error(maze)
+    if error is not None:
+        print(f"Error: {error}")
+        return False
     return True
 
-def generate_sample_maze(height: int = 15, width: int = 25) -> List[str]:
+def generate_sample_maze(height: int = 15, width: int = 25, seed: Optional[int] = None) -> List[str]:
+    """Generate a random maze in-process with maze_generator.py from the repository root"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path:
+        sys.path.append(root)
     try:
-        # Run the maze generator and capture output
-        result = subprocess.run(
-            ['python', 'maze_generator.py', str(height), str(width)],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # Split the output into lines and remove empty ones
-        maze_lines = [line for line in result.stdout.split('\n') if line.strip()]
-        return maze_lines
-        
-    except subprocess.CalledProcessError as e:
-        print(f"Error generating maze: {e}")
-        print("Falling back to simple maze...")
-        return generate_fallback_maze()
-    except FileNotFoundError:
-        print("Error: maze_generator.py not found in current directory")
+        from maze_generator import generate_rows
+    except ImportError:
+        print("Error: maze_generator.py not found")
         print("Falling back to simple maze...")
         return generate_fallback_maze()
+    return generate_rows(height, width, seed)
 
 def generate_fallback_maze() -> List[str]:
     """Generate a simple fallback maze if the generator is not available"""
@@ -234,12 +270,44 @@ def generate_fallback_maze() -> List[str]:
         "#########"
     ]
 
+def compare_strategies(maze: List[str]) -> None:
+    """Run every strategy on the same maze and print path length and cost, nodes expanded and time"""
+    print(f"\nComparing strategies on a {len(maze)}x{len(maze[0])} maze:")
+    print(f"{'algorithm':<10}{'steps':>10}{'cost':>10}{'expanded':>12}{'frontier':>10}{'time (ms)':>12}")
+    solver = MazeSolver(maze)
+    solver.find_positions()
+    grid = solver.grid
+    for name in STRATEGIES:
+        result = solver.search(name)
+        counts = f"{result.expanded:>12}{result.peak_frontier:>10}{result.elapsed * 1000:>12.2f}"
+        if result.path:
+            cost = sum(grid.costs[grid.index(row, col)] for row, col in result.path[1:])
+            print(f"{name:<10}{len(result.path) - 1:>10}{cost:>10}{counts}")
+        else:
+            print(f"{name:<10}{'-':>10}{'-':>10}{counts}")
+    
+    start = time.perf_counter()
+    graph = solver.junctions()
+    elapsed = time.perf_counter() - start
+    print(f"\nJunction graph: {graph.node_count} nodes, {graph.edge_count} edges, built in {elapsed * 1000:.2f} ms")
+    for name in ('bfs', 'dfs', 'dijkstra', 'astar'):
+        result = solver.search(name, contracted=True)
+        counts = f"{result.expanded:>12}{result.peak_frontier:>10}{result.elapsed * 1000:>12.2f}"
+        if result.path:
+            cost = sum(grid.costs[grid.index(row, col)] for row, col in result.path[1:])
+            print(f"{name:<10}{len(result.path) - 1:>10}{cost:>10}{counts}")
+        else:
+            print(f"{name:<10}{'-':>10}{'-':>10}{counts}")
+
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python search_maze.py <algorithm> <maze_file>")
-        print("  algorithm: 'bfs' or 'dfs'")
+    contracted = '--junctions' in sys.argv[3:]
+    if len(sys.argv) != 3 + contracted:
+        print("Usage: python search_maze.py <algorithm> <maze_file> [--junctions]")
+        print(f"  algorithm: one of {', '.join(STRATEGIES)}, or 'compare' to run them all")
         print("  maze_file: path to maze file")
+        print("  --junctions: search the corridor-contracted junction graph (not with bibfs)")
         print("\nExample: python search_maze.py bfs maze1.txt")
+        print("To solve many maze files at once, without drawing them: python batch.py --help")
         print("\nNo maze file provided. Generating a random maze...")
         
         # Generate a random maze
@@ -251,8 +319,11 @@ def main():
         algorithm = sys.argv[1].lower()
         filename = sys.argv[2]
         
-        if algorithm not in ['bfs', 'dfs']:
-            print("Error: Algorithm must be 'bfs' or 'dfs'")
+        if algorithm not in STRATEGIES and algorithm != 'compare':
+            print(f"Error: Algorithm must be one of {', '.join(STRATEGIES)} or 'compare'")
+            sys.exit(1)
+        if contracted and algorithm == 'bibfs':
+            print("Error: bibfs can't search the junction graph")
             sys.exit(1)
         
         maze = read_maze(filename)
@@ -261,6 +332,10 @@ def main():
     if not validate_maze(maze):
         sys.exit(1)
     
+    if algorithm == 'compare':
+        compare_strategies(maze)
+        return
+    
     # Create solver and solve maze
     solver = MazeSolver(maze)
     
@@ -270,18 +345,14 @@ def main():
     solver.display()
     
     print(f"\nSolving with {algorithm.upper()}...")
-    solution_found = solver.solve(algorithm)
+    result = solver.solve(algorithm, contracted)
     
     print(f"\nSolved Maze:")
     print("=" * 50)
     solver.display()
     
-    # Display statistics
-    if solution_found:
-        path = solver.bfs() if algorithm == 'bfs' else solver.dfs()
-        solver.display_stats(path)
-    else:
-        solver.display_stats(None)
+    # Display statistics of the one search
+    solver.display_stats(result.path, result)
     
     # Legend
     print(f"\nLegend:")
@@ -0,0 +1,253 @@
+"""
+Search strategies for MazeSolver
+
+Every strategy searches a MazeGrid between two flat cell indexes and records
+its parent links and node counts in a Search, so they can be compared on
+the same maze:
+
+    bfs       breadth-first, shortest path in steps
+    dfs       depth-first, some path, usually long
+    bibfs     breadth-first from both ends at once, meeting in the middle
+    dijkstra  cheapest path when cells have different costs
+    astar     cheapest path, guided towards the target by Manhattan distance
+
+Entering a cell costs its weight: a digit cell '1'..'9' costs that many
+steps, any other open cell costs 1. Only dijkstra and astar look at costs.
+
+All per-cell state lives in arrays preallocated for the whole grid and
+indexed by flat cell index (a bytearray for visited flags, array('i') for
+parents, depths and costs), so a search over millions of cells creates no
+per-cell tuples, sets or dicts.
+"""
+
+import collections
+import heapq
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+from grid import MazeGrid
+
+UNREACHED = -1
+
+class Search:
+    """Parent links and counters shared by the search strategies"""
+
+    def __init__(self, size: int):
+        """
+        Args:
+            size: Number of cells in the grid (len(grid.cells))
+        """
+        # Cell each reached cell was reached from (-1 for the cell a search starts at)
+        self.parent = array('i', [UNREACHED]) * size
+        # Cells taken off the frontier and expanded
+        self.expanded = 0
+        # Largest number of entries the frontier held at once
+        self.peak_frontier = 0
+
+    def path(self, index: int) -> List[int]:
+        """Follow parent links from index back to the start; returns start->index"""
+        parent = self.parent
+        path = []
+        while index >= 0:
+            path.append(index)
+            index = parent[index]
+        return path[::-1]
+
+class SearchResult:
+    """Outcome of one search: the path and what it took to find it"""
+
+    def __init__(self, algorithm: str, path: Optional[List[Tuple[int, int]]], expanded: int,
+                 peak_frontier: int, elapsed: float):
+        """
+        Args:
+            algorithm: Name of the strategy used
+            path: Cells from start to target as (row, col), or None if there is no path
+            expanded: Cells expanded
+            peak_frontier: Largest frontier size reached
+            elapsed: Search time in seconds
+        """
+        self.algorithm = algorithm
+        self.path = path
+        self.expanded = expanded
+        self.peak_frontier = peak_frontier
+        self.elapsed = elapsed
+
+    @property
+    def found(self) -> bool:
+        return self.path is not None
+
+    def __bool__(self) -> bool:
+        # Lets `if solver.solve(...)` keep meaning "a path was found"
+        return self.found
+
+    def __repr__(self) -> str:
+        steps = len(self.path) - 1 if self.path else None
+        return (f"SearchResult({self.algorithm!r}, steps={steps}, expanded={self.expanded}, "
+                f"peak_frontier={self.peak_frontier}, elapsed={self.elapsed:.6f})")
+
+def _uninformed(grid: MazeGrid, start: int, target: int, search: Search, lifo: bool) -> Optional[List[int]]:
+    """BFS (FIFO frontier) or DFS (LIFO frontier), marking cells visited when they are queued"""
+    offsets = grid.offsets
+    moves = grid.moves
+    parent = search.parent
+    visited = bytearray(len(moves))
+
+    frontier = collections.deque([start])
+    take = frontier.pop if lifo else frontier.popleft
+    visited[start] = 1
+    expanded = 0
+    peak = 1
+
+    while frontier:
+        if len(frontier) > peak:
+            peak = len(frontier)
+        current = take()
+        expanded += 1
+        if current == target:
+            break
+
+        for step in offsets[moves[current]]:
+            neighbor = current + step
+            if not visited[neighbor]:
+                visited[neighbor] = 1
+                parent[neighbor] = current
+                frontier.append(neighbor)
+    else:
+        current = UNREACHED
+
+    search.expanded += expanded
+    search.peak_frontier = max(search.peak_frontier, peak)
+    return search.path(current) if current == target else None
+
+def bfs(grid: MazeGrid, start: int, target: int, search: Search) -> Optional[List[int]]:
+    return _uninformed(grid, start, target, search, lifo=False)
+
+def dfs(grid: MazeGrid, start: int, target: int, search: Search) -> Optional[List[int]]:
+    return _uninformed(grid, start, target, search, lifo=True)
+
+def _best_first(grid: MazeGrid, start: int, target: int, search: Search,
+                heuristic: Optional[Callable[[int], int]]) -> Optional[List[int]]:
+    """Dijkstra, or A* when given a heuristic that never overestimates the remaining cost"""
+    offsets = grid.offsets
+    moves = grid.moves
+    costs = grid.costs
+    parent = search.parent
+    closed = bytearray(len(moves))
+    best = array('i', [UNREACHED]) * len(moves)
+
+    best[start] = 0
+    # Entries are (estimated total, -cost so far, cell): among equal estimates the deepest goes first
+    heap = [(heuristic(start) if heuristic else 0, 0, start)]
+    expanded = 0
+    peak = 1
+    found = False
+
+    while heap:
+        if len(heap) > peak:
+            peak = len(heap)
+        _, cost, current = heapq.heappop(heap)
+        if closed[current]:
+            continue  # A stale entry, the cell was reached more cheaply since
+        closed[current] = 1
+        expanded += 1
+        if current == target:
+            found = True
+            break
+
+        cost = -cost
+        for step in offsets[moves[current]]:
+            neighbor = current + step
+            if closed[neighbor]:
+                continue
+            new_cost = cost + costs[neighbor]
+            known = best[neighbor]
+            if known == UNREACHED or new_cost < known:
+                best[neighbor] = new_cost
+                parent[neighbor] = current
+                estimate = new_cost + heuristic(neighbor) if heuristic else new_cost
+                heapq.heappush(heap, (estimate, -new_cost, neighbor))
+
+    search.expanded += expanded
+    search.peak_frontier = max(search.peak_frontier, peak)
+    return search.path(target) if found else None
+
+def dijkstra(grid: MazeGrid, start: int, target: int, search: Search) -> Optional[List[int]]:
+    return _best_first(grid, start, target, search, None)
+
+def astar(grid: MazeGrid, start: int, target: int, search: Search) -> Optional[List[int]]:
+    stride = grid.stride
+    target_row, target_col = divmod(target, stride)
+
+    def manhattan(index: int) -> int:
+        row, col = divmod(index, stride)
+        return abs(row - target_row) + abs(col - target_col)
+
+    # Every cell costs at least 1, so the Manhattan distance never overestimates
+    return _best_first(grid, start, target, search, manhattan)
+
+def bibfs(grid: MazeGrid, start: int, target: int, search: Search) -> Optional[List[int]]:
+    """
+    Bidirectional BFS: grow breadth-first layers from both ends, always the smaller one
+
+    A layer is expanded completely before deciding, and of all the cells
+    where it touches the other side the one with the shortest total is used,
+    so the path is as short as a plain BFS one while each side only explores
+    about half the depth.
+    """
+    if start == target:
+        search.expanded += 1
+        search.peak_frontier = max(search.peak_frontier, 1)
+        return [start]
+
+    offsets = grid.offsets
+    moves = grid.moves
+    size = len(moves)
+    backward = Search(size)
+    # Depth of every cell reached from each side, UNREACHED elsewhere
+    depths = (array('i', [UNREACHED]) * size, array('i', [UNREACHED]) * size)
+    depths[0][start] = 0
+    depths[1][target] = 0
+    sides = (search, backward)
+    layers = [[start], [target]]
+    peak = 2
+    meeting = None
+
+    while layers[0] and layers[1] and meeting is None:
+        side = 0 if len(layers[0]) <= len(layers[1]) else 1
+        this, depth, other_depth = sides[side], depths[side], depths[1 - side]
+        parent = this.parent
+
+        shortest = -1
+        next_layer = []
+        for current in layers[side]:
+            this.expanded += 1
+            next_depth = depth[current] + 1
+            for step in offsets[moves[current]]:
+                neighbor = current + step
+                if other_depth[neighbor] != UNREACHED:
+                    total = next_depth + other_depth[neighbor]
+                    if meeting is None or total < shortest:
+                        meeting, shortest = (current, neighbor), total
+                if depth[neighbor] == UNREACHED:
+                    depth[neighbor] = next_depth
+                    parent[neighbor] = current
+                    next_layer.append(neighbor)
+        layers[side] = next_layer
+        peak = max(peak, len(layers[0]) + len(layers[1]))
+
+    search.expanded += backward.expanded
+    search.peak_frontier = max(search.peak_frontier, peak)
+    if meeting is None:
+        return None
+    near, far = meeting if side == 0 else meeting[::-1]
+    # Start to the near cell, then the far cell back along the target side's links
+    return search.path(near) + backward.path(far)[::-1]
+
+# Strategies selectable by name from MazeSolver.solve and the command line
+STRATEGIES: Dict[str, Callable[[MazeGrid, int, int, Search], Optional[List[int]]]] = {
+    'bfs': bfs,
+    'dfs': dfs,
+    'bibfs': bibfs,
+    'dijkstra': dijkstra,
+    'astar': astar,
+}
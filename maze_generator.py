@@ -1,46 +1,136 @@
+"""
+Random maze generator (recursive backtracker)
+
+The maze is carved in one flat bytearray, one byte per cell, by a depth-first
+walk with an explicit stack, so there is no recursion limit and no per-cell
+lists or tuples: a 10000x10000 maze is 100 MB of cells. Passing a seed makes
+the maze reproducible. Mazes can be written straight to a file, row by row,
+without building strings for the rows.
+"""
+
+import argparse
 import random
 import sys
+from array import array
+from typing import BinaryIO, Optional, Tuple
+
+WALL = ord('#')
+PATH = ord('.')
+START = ord('S')
+TARGET = ord('T')
+# Cell states while carving (see generate_cells)
+_CARVED = 0
+_UNVISITED = 1
+_STANDING = 2
+_TO_ASCII = bytes(PATH if value == _CARVED else WALL for value in range(256))
+
+# For each mask of unvisited directions (bit i set: direction i still walled off), the directions to pick from
+_CHOICES = tuple(tuple(bit for bit in range(4) if mask >> bit & 1) for mask in range(16))
+# Whether a passage with this mask has another way out after taking one, so it must be come back to
+_BRANCHES = bytes(len(choices) > 1 for choices in _CHOICES)
 
-def generate_maze(height: int, width: int) -> list[list[str]]:
+def _odd_size(height: int, width: int) -> Tuple[int, int]:
     # Ensure odd dimensions for walls and passages
     if height % 2 == 0:
         height += 1
     if width % 2 == 0:
         width += 1
+    if height < 3 or width < 3 or height == width == 3:
+        raise ValueError("Maze must be at least 3x5 to hold both S and T")
+    return height, width
 
-    # Initialize grid with walls
-    maze = [['#' for _ in range(width)] for _ in range(height)]
+def generate_cells(height: int, width: int, seed: Optional[int] = None) -> Tuple[bytearray, int, int]:
+    """
+    Carve a maze and place S and T
 
-    # Starting position (must be odd)
-    start_y, start_x = 1, 1
-    maze[start_y][start_x] = '.'
+    Args:
+        height: Rows of the maze (rounded up to odd)
+        width: Columns of the maze (rounded up to odd)
+        seed: Seed for the random choices, None for a different maze every time
 
-    # Directions (N, S, E, W)
-    directions = [(-2, 0), (2, 0), (0, -2), (0, 2)]
+    Returns:
+        (cells, height, width): the rows laid end to end as ASCII bytes, and the actual size
+    """
+    height, width = _odd_size(height, width)
+    rng = random.Random(seed)
 
-    def dfs(y: int, x: int) -> None:
-        random.shuffle(directions)
-        for dy, dx in directions:
-            ny, nx = y + dy, x + dx
-            if 1 <= ny < height - 1 and 1 <= nx < width - 1 and maze[ny][nx] == '#':
-                maze[ny - dy // 2][nx - dx // 2] = '.'
-                maze[ny][nx] = '.'
-                dfs(ny, nx)
+    # While carving, a byte is 1 for a passage not reached yet, 0 for one carved (and for
+    # anything off the maze, so the walk never steps there) and 2 for a wall still standing.
+    # One extra row above and below keeps two steps up or down from any passage in the buffer.
+    cells = bytearray([_STANDING]) * ((height + 2) * width)
+    unvisited = bytes([_UNVISITED]) * (width // 2)
+    for row in range(2, height, 2):
+        cells[row * width + 1:(row + 1) * width - 1:2] = unvisited
+    cells[:width] = cells[-width:] = bytes(width)
+    cells[::width] = cells[width - 1::width] = bytes(height + 2)
 
-    dfs(start_y, start_x)
+    # Up, down, left, right, two cells at a time
+    steps = (-2 * width, 2 * width, -2, 2)
+    up, down, left, right = steps
+    # Step taken for mask m and random byte r, at m << 8 | r (the bias of r % 3 is under 1%)
+    moves = tuple(steps[choices[r % len(choices)]] if choices else 0 for choices in _CHOICES for r in range(256))
 
-    # Place S and T in random empty cells
-    empty_cells = [(y, x) for y in range(1, height-1) for x in range(1, width-1) if maze[y][x] == '.']
-    s_y, s_x = random.choice(empty_cells)
-    t_y, t_x = random.choice(empty_cells)
-    while (t_y, t_x) == (s_y, s_x):
-        t_y, t_x = random.choice(empty_cells)
+    current = 2 * width + 1  # Starting position (row 1, column 1)
+    cells[current] = _CARVED
+    # Passages to come back to; only ones that still had another way out when they were left
+    stack = array('l')
+    push, pop = stack.append, stack.pop
+    # A perfect maze joins all of its passages, so it takes exactly one random step per passage but the first
+    for r in rng.randbytes((height // 2) * (width // 2) - 1):
+        while True:
+            mask = cells[current + up] | cells[current + down] << 1 | cells[current + left] << 2 | cells[current + right] << 3
+            if mask:
+                break
+            current = pop()
+        if _BRANCHES[mask]:
+            push(current)
+        step = moves[mask << 8 | r]
+        cells[current + (step >> 1)] = _CARVED
+        current += step
+        cells[current] = _CARVED
 
-    maze[s_y][s_x] = 'S'
-    maze[t_y][t_x] = 'T'
+    # Dropping the padding rows in place, so only the translation copies the grid
+    del cells[:width], cells[-width:]
+    cells = cells.translate(_TO_ASCII)
+    # The edges were carving sentinels; they are walls
+    cells[:width] = cells[-width:] = bytes([WALL]) * width
+    cells[::width] = cells[width - 1::width] = bytes([WALL]) * height
 
-    return maze
+    # Place S and T in random empty cells; about half of the inner cells are open
+    inner = (height - 2) * width
+    for marker in (START, TARGET):
+        while True:
+            index = width + rng.randrange(inner)
+            if cells[index] == PATH:
+                break
+        cells[index] = marker
+    return cells, height, width
 
+def generate_rows(height: int, width: int, seed: Optional[int] = None) -> list[str]:
+    """Generate a maze as a list of row strings"""
+    cells, height, width = generate_cells(height, width, seed)
+    text = cells.decode('ascii')
+    return [text[i:i + width] for i in range(0, height * width, width)]
+
+def generate_maze(height: int, width: int, seed: Optional[int] = None) -> list[list[str]]:
+    """Generate a maze as a grid of single-character cells"""
+    return [list(row) for row in generate_rows(height, width, seed)]
+
+def write_maze(out: BinaryIO, height: int, width: int, seed: Optional[int] = None) -> None:
+    """
+    Generate a maze and stream its rows to a binary file
+
+    Args:
+        out: File opened for writing bytes
+        height: Rows of the maze
+        width: Columns of the maze
+        seed: Seed for the random choices
+    """
+    cells, height, width = generate_cells(height, width, seed)
+    view = memoryview(cells)
+    for i in range(0, height * width, width):
+        out.write(view[i:i + width])
+        out.write(b'\n')
 
 def print_maze(maze: list[list[str]]) -> None:
     for row in maze:
@@ -48,12 +138,16 @@ def print_maze(maze: list[list[str]]) -> None:
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python maze_generator.py <height> <width>")
-        sys.exit(1)
-
-    height = int(sys.argv[1])
-    width = int(sys.argv[2])
+    parser = argparse.ArgumentParser(description="Generate a random maze")
+    parser.add_argument('height', type=int)
+    parser.add_argument('width', type=int)
+    parser.add_argument('--seed', type=int, default=None, help="Seed, for the same maze every time")
+    parser.add_argument('--output', default=None, help="File to write the maze to (default stdout)")
+    args = parser.parse_args()
 
-    maze = generate_maze(height, width)
-    print_maze(maze)
+    if args.output is None:
+        sys.stdout.flush()
+        write_maze(sys.stdout.buffer, args.height, args.width, args.seed)
+    else:
+        with open(args.output, 'wb') as f:
+            write_maze(f, args.height, args.width, args.seed)
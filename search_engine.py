@@ -5,64 +5,151 @@ inside the `search_loop` function.
 
 import sys
 import os
+import time
+from contextlib import contextmanager
 
-def get_char() -> str:
+try:
+    # Unix-like system (i.e. Mac, Linux)
+    import termios, tty, select
+except ImportError:
+    # Windows system
+    import msvcrt
+    termios = None
+
+
+@contextmanager
+def raw_mode():
     """
-    Read one character from stdin without pressing Enter.
-    Returns:
-        str: The character read from stdin.
+    Keep the terminal in raw mode for as long as the block runs, and restore it on exit.
+    Keys typed while a query or repaint is running then wait in the input buffer for
+    the next get_chars() instead of being echoed and flushed away by a mode switch.
     """
-    ch = ""
+    if termios is None:
+        yield
+        return
+    fd = sys.stdin.fileno()
+    old_settings = termios.tcgetattr(fd)
+    tty.setraw(fd)
     try:
-        # Unix-like system (i.e. Mac, Linux)
-        import termios, tty
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(fd)
-            ch = sys.stdin.read(1)
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-    except ImportError:
-        # Windows system
-        import msvcrt
-        ch =  msvcrt.getch().decode("utf-8")
-    return ch
+        yield
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+
+
+def get_chars() -> str:
+    """
+    Read the next keystroke from stdin without pressing Enter, together with every
+    keystroke already waiting behind it (e.g. a paste or key repeat).
+    Must be called inside raw_mode().
+    Returns:
+        str: One or more characters read from stdin.
+    """
+    if termios is None:
+        chars = msvcrt.getwch()
+        while msvcrt.kbhit():
+            chars += msvcrt.getwch()
+        return chars
+    fd = sys.stdin.fileno()
+    data = os.read(fd, 1024)
+    while select.select([fd], [], [], 0)[0]:
+        data += os.read(fd, 1024)
+    return data.decode("utf-8", errors="ignore")
+
+
+def paint(lines: list, previous: list) -> float:
+    """
+    Redraw the screen by rewriting only the lines that changed, in a single write.
+    Args:
+        lines (list): The new frame, one string per screen line.
+        previous (list): The frame currently on screen ([] clears the screen first).
+    Returns:
+        float: Time spent painting the frame, in milliseconds.
+    """
+    start = time.perf_counter()
+    out = [] if previous else ["\x1b[H\x1b[2J"]
+    for row, line in enumerate(lines):
+        if row >= len(previous) or previous[row] != line:
+            out.append(f"\x1b[{row + 1};1H{line}\x1b[K")      # go to row, write, clear rest of line
+    for row in range(len(lines), len(previous)):
+        out.append(f"\x1b[{row + 1};1H\x1b[K")
+    sys.stdout.write("".join(out))
+    sys.stdout.flush()
+    return (time.perf_counter() - start) * 1000
 
 
 def search_loop(bst: 'BST') -> None:
     """
     Prompts the user to type a word, and it will display the first 7 autocomplete suggestions
     from a given knowledge base dictionary. The loop runs until the user is pressing ESC to quit.
+    Keystrokes that arrive together are applied at once and answered with a single redraw.
     Args:
         bst (BST): The binary search tree containing the dictionary words.
     Returns:
         None
     """
     prefix = ""
-    while True:
-        ch = get_char()
-
-        # Exit on ESC
-        if ord(ch) == 27:
-            print("\nExiting...")
-            break
-
-        # Backspace (delete last char)
-        if ch in ("\b", "\x7f"):            # \x7f for Linux/mac
-            prefix = prefix[:-1]
-        elif ch == "\r":                    # ignore carriage return key (aka, Windows Enter)
-            continue
-        else:
-            prefix += ch.lower()
-
-        # Clear screen for nice output
-        os.system("cls" if os.name == "nt" else "clear")
-        print(f"Search for >> {prefix}")
-        suggestions = bst.autocomplete(prefix)
-        if suggestions:
-            for s in suggestions[:7]:  # show only first 7 suggestions
-                print(s)
-        else:
-            print("No matches found.")
-        print("\n(Press ESC to quit)")
\ No newline at end of file
+    frame = []
+    frame_ms = 0.0
+    if os.name == "nt":
+        os.system("")                       # enable ANSI escape codes in the Windows console
+    # Indexes that support sessions narrow the previous keystroke's results
+    session = bst.session(limit=7) if hasattr(bst, "session") else None
+    with raw_mode():
+        while True:
+            keys = get_chars()
+
+            quit_requested = False
+            i = 0
+            while i < len(keys):
+                ch = keys[i]
+                i += 1
+                if ch == "\x1b":
+                    if keys[i:i + 1] in ("[", "O"):
+                        # Arrow/function key escape sequence: skip it up to its final byte
+                        i += 1
+                        while i < len(keys) and not ("@" <= keys[i] <= "~"):
+                            i += 1
+                        i += 1
+                        continue
+                    # Exit on ESC
+                    quit_requested = True
+                    break
+
+                # Backspace (delete last char)
+                if ch in ("\b", "\x7f"):        # \x7f for Linux/mac
+                    prefix = prefix[:-1]
+                elif ch == "\r":                # ignore carriage return key (aka, Windows Enter)
+                    continue
+                else:
+                    prefix += ch.lower()
+
+            if quit_requested:
+                break
+
+            start = time.perf_counter()
+            lines = [f"Search for >> {prefix}"]
+            if session is not None:
+                session.set_prefix(prefix)
+                suggestions = session.suggestions()
+            else:
+                suggestions = bst.autocomplete(prefix, limit=7)  # show only first 7 suggestions
+            if not suggestions and hasattr(bst, "fuzzy_autocomplete"):
+                # Maybe a typo: look for words within one edit of the prefix
+                suggestions = bst.fuzzy_autocomplete(prefix, max_distance=1, limit=7)
+                if suggestions:
+                    lines.append("Did you mean:")
+            if suggestions:
+                lines.extend(suggestions)
+            else:
+                lines.append("No matches found.")
+            query_ms = (time.perf_counter() - start) * 1000
+            lines.append("")
+            lines.append("(Press ESC to quit)")
+            lines.append(f"(query {query_ms:.2f} ms, last frame {frame_ms:.2f} ms)")
+
+            frame_ms = paint(lines, frame)
+            frame = lines
+
+    # Back in cooked mode: move below the last frame before printing
+    sys.stdout.write(f"\x1b[{len(frame) + 1};1H")
+    print("\nExiting...")